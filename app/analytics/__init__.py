@@ -0,0 +1,22 @@
+"""Analytics module for the AI Financial Assistant.
+
+This package contains numerical analysis of positions and option chains.
+Submodules are imported on first use so numpy/pandas/scipy stay off the startup path.
+"""
+import importlib
+
+_LAZY_ATTRS = {
+    'scan_chain': '.chain_quality',
+    'PortfolioRisk': '.risk',
+    'positions_to_frame': '.risk',
+}
+
+__all__ = ['PortfolioRisk', 'positions_to_frame', 'scan_chain']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,198 @@
+"""Arbitrage and data-quality checks for option chains.
+
+Works on the flattened chain layout produced by etrade.get_options_chain
+(strike, call_bid, call_ask, call_iv, put_bid, put_ask, put_iv, ...). An
+optional `expiry` column holds several expiries in one frame; every check runs
+as array operations over the whole frame, including the cross-expiry calendar
+check.
+
+A check only flags rows it has input data for: checks whose columns are
+missing are skipped (and listed in the report's attrs["skipped_checks"]),
+missing values never count as bad quotes, and put-call parity only runs on
+rows with a known, unexpired expiry.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+MIN_IV = 0.01
+MAX_IV = 5.0
+PARITY_TOLERANCE = 0.05   # dollars of slack on top of the quoted spreads
+PRICE_TOLERANCE = 0.01    # slack for strike monotonicity / calendar checks
+DEFAULT_RATE = 0.04
+
+# Flag columns added by scan_chain, in report order
+CHECKS = [
+    "crossed_call", "crossed_put",
+    "zero_bid_call", "zero_bid_put",
+    "stale_iv_call", "stale_iv_put",
+    "parity_violation",
+    "monotonic_call", "monotonic_put",
+    "calendar_call", "calendar_put",
+]
+
+
+def _col(df, name):
+    if name in df:
+        return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+    return np.full(len(df), np.nan)
+
+
+def _has_data(*arrays):
+    return all(not np.isnan(a).all() for a in arrays)
+
+
+def _year_fractions(expiries, today):
+    """Time to expiry in years per distinct expiry; NaN where unparseable or expired."""
+    parsed = pd.to_datetime(pd.Series(expiries), format="mixed", errors="coerce")
+    days = (parsed - pd.Timestamp(today)).dt.days.to_numpy(dtype=float)
+    return np.where(days > 0, days, np.nan) / 365.0
+
+
+def _neighbour(values, same_group, step):
+    """values shifted by `step` rows, NaN where the neighbour is in another group."""
+    out = np.full(len(values), np.nan)
+    if step > 0:
+        out[:-step] = np.where(same_group, values[step:], np.nan)
+    else:
+        out[-step:] = np.where(same_group, values[:step], np.nan)
+    return out
+
+
+def _stale_iv(iv, same_next):
+    """IV out of range, or flat-lined across three consecutive strikes."""
+    bad = (iv < MIN_IV) | (iv > MAX_IV)
+    prev_iv = _neighbour(iv, same_next, -1)
+    next_iv = _neighbour(iv, same_next, 1)
+    flat = (iv == prev_iv) & (iv == next_iv)
+    # the two neighbours of a flat middle strike are part of the same run
+    flat |= np.r_[False, flat[:-1] & same_next] | np.r_[flat[1:] & same_next, False]
+    return bad | flat
+
+
+def scan_chain(chain, spot=None, rate=DEFAULT_RATE, today=None, drop=False):
+    """Flag bad quotes and arbitrage violations in an options chain.
+
+    Args:
+        chain: DataFrame in the get_options_chain layout, optionally with an
+            `expiry` column for multi-expiry chains
+        spot: Underlying price; if None, it is implied per expiry from the
+            median of put-call parity across strikes
+        rate: Risk-free rate used to discount strikes
+        today: Valuation date for time to expiry (defaults to today)
+        drop: If True, return only rows with no flags
+
+    Returns:
+        tuple: (chain with a boolean column per check plus `flagged`,
+        per-expiry quality report with flag counts and `quality_score`;
+        report.attrs["skipped_checks"] lists checks that had no input data)
+    """
+    today = today or date.today()
+    df = chain.copy()
+    if "expiry" not in df:
+        df["expiry"] = ""
+    df = df.sort_values(["expiry", "strike"], kind="stable")
+    n = len(df)
+    if n == 0:
+        for name in CHECKS + ["flagged"]:
+            df[name] = pd.Series(dtype=bool)
+        report = pd.DataFrame(columns=["rows"] + CHECKS + ["flagged_rows", "quality_score"])
+        report.attrs["skipped_checks"] = list(CHECKS)
+        return df, report
+
+    expiry = df["expiry"].astype(str).to_numpy()
+    strike = _col(df, "strike")
+    c_bid, c_ask, c_iv = _col(df, "call_bid"), _col(df, "call_ask"), _col(df, "call_iv")
+    p_bid, p_ask, p_iv = _col(df, "put_bid"), _col(df, "put_ask"), _col(df, "put_iv")
+    expiry_code, expiries = pd.factorize(expiry, sort=True)
+    same_next = expiry_code[1:] == expiry_code[:-1]
+
+    no_flags = np.zeros(n, dtype=bool)
+    flags = {name: no_flags for name in CHECKS}
+    skipped = []
+
+    def run(names, *inputs):
+        """True if every input column has data; otherwise mark the checks skipped."""
+        if _has_data(*inputs):
+            return True
+        skipped.extend(names)
+        return False
+
+    # Comparisons against NaN are False, so missing quotes are never flagged
+    if run(["crossed_call"], c_bid, c_ask):
+        flags["crossed_call"] = c_bid > c_ask
+    if run(["crossed_put"], p_bid, p_ask):
+        flags["crossed_put"] = p_bid > p_ask
+    if run(["zero_bid_call"], c_bid):
+        flags["zero_bid_call"] = c_bid <= 0
+    if run(["zero_bid_put"], p_bid):
+        flags["zero_bid_put"] = p_bid <= 0
+    if run(["stale_iv_call"], c_iv):
+        flags["stale_iv_call"] = _stale_iv(c_iv, same_next)
+    if run(["stale_iv_put"], p_iv):
+        flags["stale_iv_put"] = _stale_iv(p_iv, same_next)
+
+    # Put-call parity: C - P = S - K*exp(-rT). Using bid/ask bounds, a violation
+    # is when even the most favourable quotes can't be reconciled with S. Rows
+    # without a usable T (no/unparseable/expired expiry) are not checked.
+    t = _year_fractions(expiries, today)[expiry_code]
+    if run(["parity_violation"], c_bid, c_ask, p_bid, p_ask, t):
+        disc_k = strike * np.exp(-rate * t)
+        implied_lo = c_bid - p_ask + disc_k
+        implied_hi = c_ask - p_bid + disc_k
+        if spot is None:
+            mid_implied = pd.Series((implied_lo + implied_hi) / 2.0)
+            spot_arr = mid_implied.groupby(expiry_code).median().reindex(range(len(expiries))).to_numpy()[expiry_code]
+        else:
+            spot_arr = np.full(n, float(spot))
+        flags["parity_violation"] = (
+            (implied_lo > spot_arr + PARITY_TOLERANCE) | (implied_hi < spot_arr - PARITY_TOLERANCE)
+        )
+
+    # Strike monotonicity: calls non-increasing, puts non-decreasing in strike.
+    # Arbitrage when a higher strike call bids above a lower strike call's ask.
+    if run(["monotonic_call"], c_bid, c_ask):
+        next_c_bid = _neighbour(c_bid, same_next, 1)
+        mono_call = next_c_bid > c_ask + PRICE_TOLERANCE   # row i vs row i+1
+        # flag both legs of the offending pair
+        flags["monotonic_call"] = mono_call | np.r_[False, mono_call[:-1]]
+    if run(["monotonic_put"], p_bid, p_ask):
+        prev_p_bid = _neighbour(p_bid, same_next, -1)
+        mono_put = prev_p_bid > p_ask + PRICE_TOLERANCE    # row i vs row i-1
+        flags["monotonic_put"] = mono_put | np.r_[mono_put[1:], False]
+
+    # Calendar: for the same strike, a longer-dated option can't be offered
+    # below a shorter-dated one's bid. Compare adjacent expiries per strike.
+    by_strike = np.lexsort((expiry_code, strike))
+    s_sorted = strike[by_strike]
+    same_strike = s_sorted[1:] == s_sorted[:-1]
+    for side, bid, ask in (("call", c_bid, c_ask), ("put", p_bid, p_ask)):
+        name = f"calendar_{side}"
+        if len(expiries) < 2 or not run([name], bid, ask):
+            continue
+        b, a = bid[by_strike], ask[by_strike]
+        bad_pair = same_strike & (a[1:] + PRICE_TOLERANCE < b[:-1])
+        bad_sorted = np.r_[bad_pair, False] | np.r_[False, bad_pair]
+        bad = np.empty(n, dtype=bool)
+        bad[by_strike] = bad_sorted
+        flags[name] = bad
+
+    for name in CHECKS:
+        df[name] = flags[name]
+    df["flagged"] = np.logical_or.reduce([flags[name] for name in CHECKS])
+
+    # per-expiry counts via bincount on the factorized expiry codes
+    k = len(expiries)
+    report = pd.DataFrame(
+        {name: np.bincount(expiry_code, weights=flags[name], minlength=k).astype(int) for name in CHECKS},
+        index=pd.Index(expiries, name="expiry"),
+    )
+    report.insert(0, "rows", np.bincount(expiry_code, minlength=k))
+    report["flagged_rows"] = np.bincount(expiry_code, weights=df["flagged"].to_numpy(), minlength=k).astype(int)
+    report["quality_score"] = 1.0 - report["flagged_rows"] / report["rows"]
+    report.attrs["skipped_checks"] = skipped
+
+    if drop:
+        df = df[~df["flagged"]]
+    return df, report
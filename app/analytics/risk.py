@@ -0,0 +1,272 @@
+"""Portfolio risk aggregation.
+
+Positions are held as parallel NumPy arrays so that net Greeks, spot x vol
+scenario P&L grids and what-if evaluation of screener candidates are each a
+single vectorized pass.
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+CONTRACT_MULTIPLIER = 100
+DEFAULT_RATE = 0.04
+DEFAULT_IV = 0.30
+DEFAULT_SPOT_SHOCKS = np.linspace(-0.20, 0.20, 9)          # relative spot moves
+DEFAULT_VOL_SHOCKS = np.array([-0.10, -0.05, 0.0, 0.05, 0.10])  # absolute vol moves
+MIN_IV = 0.01
+MIN_T = 1.0 / (365 * 24)  # one hour, avoids division by zero on expiry day
+
+# Columns expected by PortfolioRisk for positions and candidates.
+# option_type is "CALL", "PUT" or None (stock); quantity is signed
+# (contracts for options, shares for stock).
+POSITION_COLUMNS = ["symbol", "option_type", "strike", "expiry", "iv", "quantity"]
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def _bs(spot, strike, t, iv, is_call, rate):
+    """Black-Scholes value and d1/d2 for broadcastable arrays."""
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * iv * iv) * t) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    disc = np.exp(-rate * t)
+    call = spot * ndtr(d1) - strike * disc * ndtr(d2)
+    put = strike * disc * ndtr(-d2) - spot * ndtr(-d1)
+    return np.where(is_call, call, put), d1, d2
+
+
+def _year_fraction(expiry, today):
+    if isinstance(expiry, str):
+        fmt = "%Y%m%d" if len(expiry) == 8 else "%Y-%m-%d"
+        expiry = datetime.strptime(expiry, fmt).date()
+    elif isinstance(expiry, datetime):
+        expiry = expiry.date()
+    return max((expiry - today).days / 365.0, MIN_T)
+
+
+def positions_to_frame(positions):
+    """Convert E*TRADE portfolio Position records into a POSITION_COLUMNS frame.
+
+    Args:
+        positions: Records from etrade.client.get_portfolio_positions (COMPLETE view)
+
+    Returns:
+        pd.DataFrame: One row per equity or option position
+    """
+    rows = []
+    for pos in positions:
+        product = pos.get("Product", {})
+        complete = pos.get("Complete", {})
+        sec_type = product.get("securityType")
+        if sec_type not in ("EQ", "OPTN"):
+            continue
+        qty = float(pos.get("quantity", 0))
+        if pos.get("positionType") == "SHORT" and qty > 0:
+            qty = -qty
+        row = {"symbol": product.get("symbol", "").upper(), "option_type": None,
+               "strike": np.nan, "expiry": None, "iv": np.nan, "quantity": qty}
+        if sec_type == "OPTN":
+            row["option_type"] = product.get("callPut")
+            row["strike"] = float(product.get("strikePrice", np.nan))
+            row["expiry"] = date(int(product["expiryYear"]), int(product["expiryMonth"]),
+                                 int(product["expiryDay"]))
+            iv_pct = complete.get("ivPct")
+            row["iv"] = float(iv_pct) / 100.0 if iv_pct else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows, columns=POSITION_COLUMNS)
+
+
+def _leg_arrays(frame, spots, today, rate):
+    """Turn a POSITION_COLUMNS frame into the per-leg arrays used by the engine."""
+    n = len(frame)
+    symbols = frame["symbol"].str.upper().to_numpy()
+    missing = sorted(set(symbols) - set(spots))
+    if missing:
+        raise ValueError(f"No spot price for: {', '.join(missing)}")
+
+    option_type = frame["option_type"].fillna("").str.upper().to_numpy()
+    is_option = np.isin(option_type, ["CALL", "PUT"])
+    is_call = option_type == "CALL"
+    spot = np.array([spots[s] for s in symbols], dtype=float)
+    strike = np.where(is_option, frame["strike"].to_numpy(dtype=float), spot)
+    iv = frame["iv"].to_numpy(dtype=float) if "iv" in frame else np.full(n, np.nan)
+    iv = np.maximum(np.where(np.isnan(iv), DEFAULT_IV, iv), MIN_IV)
+    t = np.array([
+        _year_fraction(e, today) if opt else MIN_T
+        for e, opt in zip(frame["expiry"], is_option)
+    ], dtype=float)
+    qty = frame["quantity"].to_numpy(dtype=float)
+    units = np.where(is_option, qty * CONTRACT_MULTIPLIER, qty)
+
+    value, d1, _ = _bs(spot, strike, t, iv, is_call, rate)
+    value = np.where(is_option, value, spot)
+    return {
+        "symbols": symbols, "is_option": is_option, "is_call": is_call,
+        "spot": spot, "strike": strike, "t": t, "iv": iv,
+        "units": units, "value": value, "d1": d1,
+    }
+
+
+def _leg_greeks(legs, rate):
+    """Per-leg position Greeks (already scaled by units)."""
+    is_option, is_call = legs["is_option"], legs["is_call"]
+    spot, strike, t, iv, d1 = legs["spot"], legs["strike"], legs["t"], legs["iv"], legs["d1"]
+    sqrt_t = np.sqrt(t)
+    pdf = _norm_pdf(d1)
+    d2 = d1 - iv * sqrt_t
+    disc = np.exp(-rate * t)
+
+    delta = np.where(is_option, np.where(is_call, ndtr(d1), ndtr(d1) - 1.0), 1.0)
+    gamma = np.where(is_option, pdf / (spot * iv * sqrt_t), 0.0)
+    vega = np.where(is_option, spot * pdf * sqrt_t / 100.0, 0.0)  # per vol point
+    theta_call = -spot * pdf * iv / (2 * sqrt_t) - rate * strike * disc * ndtr(d2)
+    theta_put = -spot * pdf * iv / (2 * sqrt_t) + rate * strike * disc * ndtr(-d2)
+    theta = np.where(is_option, np.where(is_call, theta_call, theta_put) / 365.0, 0.0)  # per day
+
+    units = legs["units"]
+    return {
+        "delta": delta * units,
+        "gamma": gamma * units,
+        "vega": vega * units,
+        "theta": theta * units,
+        "dollar_delta": delta * units * spot,
+    }
+
+
+def _leg_scenarios(legs, spot_shocks, vol_shocks, rate):
+    """Per-leg P&L over the spot x vol grid, shape (n_legs, n_spot, n_vol)."""
+    spot = legs["spot"][:, None, None] * (1.0 + spot_shocks[None, :, None])
+    iv = np.maximum(legs["iv"][:, None, None] + vol_shocks[None, None, :], MIN_IV)
+    strike = legs["strike"][:, None, None]
+    t = legs["t"][:, None, None]
+    is_call = legs["is_call"][:, None, None]
+    value, _, _ = _bs(spot, strike, t, iv, is_call, rate)
+    value = np.where(legs["is_option"][:, None, None], value, spot)
+    return (value - legs["value"][:, None, None]) * legs["units"][:, None, None]
+
+
+def _leg_requirement(legs):
+    """Approximate buying power consumed per leg (no spread offsets)."""
+    units, spot, strike, value = legs["units"], legs["spot"], legs["strike"], legs["value"]
+    is_option, is_call = legs["is_option"], legs["is_call"]
+    otm = np.where(is_call, np.maximum(strike - spot, 0.0), np.maximum(spot - strike, 0.0))
+    floor = 0.10 * np.where(is_call, spot, strike)
+    short_req = np.maximum(0.20 * spot - otm, floor)
+    option_req = np.where(units > 0, value, short_req) * np.abs(units)
+    return np.where(is_option, option_req, spot * np.abs(units))
+
+
+class PortfolioRisk:
+    """Vectorized risk view of a book of equity and option positions.
+
+    Args:
+        positions: DataFrame with POSITION_COLUMNS (see positions_to_frame)
+        spots: Mapping of underlying symbol to spot price
+        buying_power: Current buying power, used by what_if
+        rate: Risk-free rate for Black-Scholes
+        today: Valuation date (defaults to today)
+    """
+
+    def __init__(self, positions, spots, buying_power=None, rate=DEFAULT_RATE, today=None):
+        self.spots = {k.upper(): float(v) for k, v in spots.items()}
+        self.buying_power = buying_power
+        self.rate = rate
+        self.today = today or date.today()
+        self.positions = positions.reset_index(drop=True)
+        self._legs = _leg_arrays(self.positions, self.spots, self.today, rate)
+        self._greeks = _leg_greeks(self._legs, rate)
+        self._grid_cache = {}
+
+    def net_greeks(self, by_underlying=True):
+        """Net position Greeks, per underlying and/or in total.
+
+        Returns:
+            pd.DataFrame: delta (share-equivalent), gamma, vega (per vol point),
+            theta (per day) and dollar_delta
+        """
+        df = pd.DataFrame(self._greeks)
+        df["symbol"] = self._legs["symbols"]
+        if by_underlying:
+            return df.groupby("symbol").sum()
+        return df.drop(columns="symbol").sum().to_frame("total").T
+
+    def _book_grid(self, spot_shocks, vol_shocks):
+        key = (spot_shocks.tobytes(), vol_shocks.tobytes())
+        if key not in self._grid_cache:
+            self._grid_cache[key] = _leg_scenarios(
+                self._legs, spot_shocks, vol_shocks, self.rate
+            ).sum(axis=0)
+        return self._grid_cache[key]
+
+    def scenario_grid(self, spot_shocks=DEFAULT_SPOT_SHOCKS, vol_shocks=DEFAULT_VOL_SHOCKS):
+        """Book P&L for every (spot shock, vol shock) pair.
+
+        All underlyings move by the same relative spot shock and the same
+        absolute vol shock.
+
+        Returns:
+            pd.DataFrame: rows are spot shocks, columns are vol shocks
+        """
+        spot_shocks = np.asarray(spot_shocks, dtype=float)
+        vol_shocks = np.asarray(vol_shocks, dtype=float)
+        return pd.DataFrame(
+            self._book_grid(spot_shocks, vol_shocks),
+            index=pd.Index(spot_shocks, name="spot_shock"),
+            columns=pd.Index(vol_shocks, name="vol_shock"),
+        )
+
+    def what_if(self, candidates, spots=None, spot_shocks=DEFAULT_SPOT_SHOCKS,
+                vol_shocks=DEFAULT_VOL_SHOCKS):
+        """Evaluate candidate trades as additions to the current book.
+
+        Greeks and scenario P&L are additive, so the book is computed once
+        (and cached) and only the candidate legs are priced, all in one pass.
+
+        Args:
+            candidates: DataFrame with POSITION_COLUMNS; an optional
+                `candidate_id` column groups multi-leg trades (default: one
+                candidate per row)
+            spots: Extra spot prices for underlyings not already in the book
+            spot_shocks, vol_shocks: Scenario grid axes
+
+        Returns:
+            pd.DataFrame: one row per candidate with post-trade Greeks, their
+            change, worst-case grid P&L and buying power impact
+        """
+        candidates = candidates.reset_index(drop=True)
+        if candidates.empty:
+            return pd.DataFrame()
+        spot_shocks = np.asarray(spot_shocks, dtype=float)
+        vol_shocks = np.asarray(vol_shocks, dtype=float)
+        all_spots = {**self.spots, **{k.upper(): float(v) for k, v in (spots or {}).items()}}
+
+        if "candidate_id" in candidates:
+            ids, inverse = np.unique(candidates["candidate_id"].to_numpy(), return_inverse=True)
+        else:
+            ids, inverse = np.arange(len(candidates)), np.arange(len(candidates))
+        k = len(ids)
+
+        legs = _leg_arrays(candidates, all_spots, self.today, self.rate)
+        greeks = _leg_greeks(legs, self.rate)
+        grids = _leg_scenarios(legs, spot_shocks, vol_shocks, self.rate)
+        requirement = _leg_requirement(legs)
+
+        cand_grid = np.zeros((k,) + grids.shape[1:])
+        np.add.at(cand_grid, inverse, grids)
+        total_grid = self._book_grid(spot_shocks, vol_shocks)[None, :, :] + cand_grid
+
+        out = pd.DataFrame(index=pd.Index(ids, name="candidate_id"))
+        for name, leg_values in greeks.items():
+            change = np.bincount(inverse, weights=leg_values, minlength=k)
+            out[f"{name}_change"] = change
+            out[f"{name}_after"] = self._greeks[name].sum() + change
+        out["worst_pnl_before"] = self._book_grid(spot_shocks, vol_shocks).min()
+        out["worst_pnl_after"] = total_grid.reshape(k, -1).min(axis=1)
+        out["bp_required"] = np.bincount(inverse, weights=requirement, minlength=k)
+        if self.buying_power is not None:
+            out["bp_after"] = self.buying_power - out["bp_required"]
+        return out
@@ -6,6 +6,179 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import etrade.client as etrade_client
+from analytics.chain_quality import scan_chain
+
+# Cache lifetimes for market data fetched by the chain view
+EXPIRY_CACHE_TTL = 60 * 60  # expiry calendars change at most daily
+CHAIN_CACHE_TTL = 60        # quotes go stale quickly
+
+DEFAULT_PAGE_SIZE = 25
+DEFAULT_STRIKE_WINDOW = 10  # strikes shown on either side of ATM
+
+# chain_quality checks that condemn each side's quote; parity involves both
+SIDE_CHECKS = {
+    "call": ["crossed_call", "zero_bid_call", "stale_iv_call", "monotonic_call", "parity_violation"],
+    "put": ["crossed_put", "zero_bid_put", "stale_iv_put", "monotonic_put", "parity_violation"],
+}
+
+
+@st.cache_data(ttl=EXPIRY_CACHE_TTL, show_spinner=False)
+def _fetch_expire_dates(_session, base_url, symbol):
+    """Fetch (and cache) the option expiry dates for a symbol.
+
+    The session is excluded from the cache key (leading underscore) since it is
+    not hashable; base_url and symbol identify the request.
+    """
+    return etrade_client.get_option_expire_dates(_session, base_url, symbol)
+
+
+@st.cache_data(ttl=CHAIN_CACHE_TTL, show_spinner=False)
+def _fetch_chain_frames(_session, base_url, symbol, expiry):
+    """Fetch an option chain and build the calls/puts DataFrames once per TTL.
+
+    Rows are run through the chain quality scan and carry a `flagged` column.
+
+    Returns:
+        tuple: (calls_df, puts_df, quality report) with frames sorted by
+        strike, or (None, None, None) if no data
+    """
+    chain = etrade_client.get_option_chains(_session, base_url, symbol, expiry)
+    if not chain or not (chain.get('CALL') or chain.get('PUT')):
+        return None, None, None
+    calls_df, puts_df = chain_to_frames(chain)
+    report = flag_bad_quotes(calls_df, puts_df, expiry)
+    return calls_df, puts_df, report
+
+
+def chain_to_frames(chain):
+    """Build the calls/puts DataFrames for a {"CALL": [...], "PUT": [...]} chain.
+
+    Returns:
+        tuple: (calls_df, puts_df) sorted by strike
+    """
+    calls_df = pd.DataFrame([
+        {**opt, 'type': 'CALL'}
+        for opt in chain.get('CALL', [])
+    ])
+    puts_df = pd.DataFrame([
+        {**opt, 'type': 'PUT'}
+        for opt in chain.get('PUT', [])
+    ])
+    for df in (calls_df, puts_df):
+        if "strikePrice" in df.columns:
+            df.sort_values("strikePrice", inplace=True, ignore_index=True)
+    return calls_df, puts_df
+
+
+def flag_bad_quotes(calls_df, puts_df, expiry=None, today=None):
+    """Scan a calls/puts frame pair with analytics.chain_quality.
+
+    Sets a boolean `flagged` column on each frame (in place) for quotes that
+    are crossed, zero-bid, stale or violate strike monotonicity or put-call
+    parity.
+
+    Args:
+        calls_df, puts_df: Frames from chain_to_frames
+        expiry: Expiry as "YYYYMMDD" or "YYYY-MM-DD"; parity needs it
+        today: Valuation date for the scan (defaults to today)
+
+    Returns:
+        pd.DataFrame: The scan's quality report, or None if there was nothing to scan
+    """
+    flat = None
+    for side, df in (("call", calls_df), ("put", puts_df)):
+        df["flagged"] = False
+        if df.empty or "strikePrice" not in df.columns:
+            continue
+        columns = {"strikePrice": "strike", "bid": f"{side}_bid", "ask": f"{side}_ask", "iv": f"{side}_iv"}
+        quotes = df[[c for c in columns if c in df.columns]].drop_duplicates("strikePrice").rename(columns=columns)
+        flat = quotes if flat is None else flat.merge(quotes, on="strike", how="outer")
+    if flat is None:
+        return None
+
+    if expiry:
+        expiry = str(expiry)
+        flat["expiry"] = f"{expiry[:4]}-{expiry[4:6]}-{expiry[6:]}" if len(expiry) == 8 else expiry
+    scanned, report = scan_chain(flat, today=today)
+    for side, df in (("call", calls_df), ("put", puts_df)):
+        if df.empty or "strikePrice" not in df.columns:
+            continue
+        bad = scanned[SIDE_CHECKS[side]].any(axis=1)
+        df["flagged"] = df["strikePrice"].isin(scanned.loc[bad, "strike"])
+    return report
+
+
+def _estimate_atm_strike(calls_df, puts_df):
+    """Estimate the at-the-money strike from the chain itself.
+
+    Uses the strike where call and put mid prices are closest (put-call parity),
+    falling back to the median strike when quotes or one side are missing.
+    """
+    sides = [df for df in (calls_df, puts_df) if not df.empty and "strikePrice" in df.columns]
+    if not sides:
+        return None
+    strikes = sides[0]["strikePrice"]
+    if len(sides) < 2 or not all({"bid", "ask"}.issubset(df.columns) for df in sides):
+        return float(strikes.median())
+
+    call_mid = calls_df.groupby("strikePrice")[["bid", "ask"]].mean().mean(axis=1)
+    put_mid = puts_df.groupby("strikePrice")[["bid", "ask"]].mean().mean(axis=1)
+    diff = (call_mid - put_mid).abs().dropna()
+    if diff.empty:
+        return float(strikes.median())
+    return float(diff.idxmin())
+
+
+def _strike_window(df, atm_strike, width):
+    """Keep only `width` strikes on either side of the ATM strike."""
+    if df.empty or atm_strike is None or "strikePrice" not in df.columns:
+        return df
+    strikes = df["strikePrice"].drop_duplicates().sort_values(ignore_index=True)
+    center = int((strikes - atm_strike).abs().idxmin())
+    lo = strikes.iloc[max(center - width, 0)]
+    hi = strikes.iloc[min(center + width, len(strikes) - 1)]
+    return df[df["strikePrice"].between(lo, hi)]
+
+
+def _paginate(df, page, page_size):
+    """Return the rows for a 1-based page number."""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def _chain_column_config(kind):
+    """Column config shared by the calls and puts tables."""
+    return {
+        "symbol": None,  # Hide full option symbol
+        "type": None,    # Hide type since each table holds a single kind
+        "optionCategory": None,  # Hide category
+        "optionRootSymbol": None,
+        "strikePrice": st.column_config.NumberColumn(
+            "Strike",
+            help=f"Strike price of the {kind} option",
+            format="$%.2f"
+        ),
+        "bid": st.column_config.NumberColumn(
+            "Bid",
+            help="Current bid price",
+            format="$%.2f"
+        ),
+        "ask": st.column_config.NumberColumn(
+            "Ask",
+            help="Current ask price",
+            format="$%.2f"
+        ),
+        "lastPrice": st.column_config.NumberColumn(
+            "Last",
+            help="Last traded price",
+            format="$%.2f"
+        ),
+        "flagged": st.column_config.CheckboxColumn(
+            "Bad quote",
+            help="Crossed, zero-bid, stale IV or arbitrage-violating quote"
+        ),
+    }
+
 
 def render_market_search(session, base_url):
     """Render the market search UI section.
@@ -42,8 +215,9 @@ def render_market_search(session, base_url):
             st.dataframe(
                 df,
                 column_config={
-                    "All": "All Exchanges",
-                    "symbolDescription": "Description"
+                    "symbol": "Symbol",
+                    "description": "Description",
+                    "type": "Type"
                 }
             )
             
@@ -55,7 +229,10 @@ def render_market_search(session, base_url):
 
 def render_option_chain(session, base_url, symbol):
     """Render the options chain UI section.
-    
+
+    The chain itself lives in a fragment, so changing the expiry, strike window
+    or page reruns only the chain panel rather than the whole app.
+
     Args:
         session: An authenticated E*TRADE session
         base_url: The base API URL for E*TRADE calls
@@ -65,122 +242,119 @@ def render_option_chain(session, base_url, symbol):
         return
 
     st.markdown("## 📊 Options Chain")
-    
+    _render_chain_panel(session, base_url, symbol)
+
+
+@st.fragment
+def _render_chain_panel(session, base_url, symbol):
+    """Render expiry selection, filters and the paginated calls/puts tables."""
     try:
         # Get expiry dates
-        dates = etrade_client.get_option_expire_dates(session, base_url, symbol)
+        dates = _fetch_expire_dates(session, base_url, symbol)
         if not dates:
             st.warning(f"No options available for {symbol}")
             return
 
         # Format dates for selection
         date_choices = {
-            datetime.strptime(d, "%Y%m%d").strftime("%Y-%m-%d"): d 
+            datetime.strptime(d, "%Y%m%d").strftime("%Y-%m-%d"): d
             for d in dates
         }
         selected_date = st.selectbox(
             "Select expiration date:",
             options=list(date_choices.keys()),
             format_func=lambda x: x,
-            help="Choose an expiration date to view available options."
+            help="Choose an expiration date to view available options.",
+            key=f"chain_expiry_{symbol}"
         )
-        
+
         if not selected_date:
             return
-            
+
         expiry = date_choices[selected_date]
-        
-        # Get chain
-        chain = etrade_client.get_option_chains(
-            session, base_url, symbol, expiry
-        )
-        
-        if not chain:
+
+        # Get chain (cached per symbol/expiry)
+        calls_df, puts_df, quality = _fetch_chain_frames(session, base_url, symbol, expiry)
+
+        if calls_df is None:
             st.warning(f"No options data available for {symbol} expiring {selected_date}")
             return
-            
-        # Create DataFrames for puts and calls
-        calls_df = pd.DataFrame([
-            {**opt, 'type': 'CALL'}
-            for opt in chain.get('CALL', [])
-        ])
-        puts_df = pd.DataFrame([
-            {**opt, 'type': 'PUT'} 
-            for opt in chain.get('PUT', [])
-        ])
-        
-        # Display chains
+
+        if quality is not None:
+            flagged = int(calls_df["flagged"].sum() + puts_df["flagged"].sum())
+            st.caption(
+                f"Data quality: {quality['quality_score'].iloc[0]:.0%} ({flagged} quotes flagged)"
+                + (f"; skipped for missing data: {', '.join(quality.attrs['skipped_checks'])}"
+                   if quality.attrs.get("skipped_checks") else "")
+            )
+        hide_flagged = st.checkbox(
+            "Hide flagged quotes",
+            value=True,
+            help="Drop crossed, zero-bid, stale and arbitrage-violating quotes from the tables.",
+            key=f"chain_hide_flagged_{symbol}"
+        )
+        if hide_flagged:
+            calls_df = calls_df[~calls_df["flagged"]].drop(columns="flagged")
+            puts_df = puts_df[~puts_df["flagged"]].drop(columns="flagged")
+
+        # Filters: strikes around ATM and rows per page
+        fcol1, fcol2 = st.columns(2)
+        with fcol1:
+            width = st.number_input(
+                "Strikes around ATM:",
+                min_value=1,
+                value=DEFAULT_STRIKE_WINDOW,
+                help="Number of strikes to show on either side of the at-the-money strike.",
+                key=f"chain_width_{symbol}"
+            )
+        with fcol2:
+            page_size = st.selectbox(
+                "Rows per page:",
+                options=[10, 25, 50, 100],
+                index=[10, 25, 50, 100].index(DEFAULT_PAGE_SIZE),
+                key=f"chain_page_size_{symbol}"
+            )
+
+        atm_strike = _estimate_atm_strike(calls_df, puts_df)
+        calls_view = _strike_window(calls_df, atm_strike, int(width))
+        puts_view = _strike_window(puts_df, atm_strike, int(width))
+
+        total_rows = max(len(calls_view), len(puts_view))
+        page_count = max(1, -(-total_rows // page_size))
+        page = st.number_input(
+            f"Page (of {page_count}):",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            key=f"chain_page_{symbol}_{expiry}_{width}_{page_size}"
+        )
+        if atm_strike is not None:
+            st.caption(f"ATM strike ≈ ${atm_strike:,.2f}")
+
+        # Display chains; only the visible page is sent to the browser
         col1, col2 = st.columns(2)
-        
+
         with col1:
             st.markdown("### Calls")
-            if not calls_df.empty:
+            if not calls_view.empty:
                 st.dataframe(
-                    calls_df,
-                    column_config={
-                        "symbol": None,  # Hide full option symbol
-                        "type": None,    # Hide type since we know these are calls
-                        "OptionCategory": None,  # Hide category
-                        "strikePrice": st.column_config.NumberColumn(
-                            "Strike",
-                            help="Strike price of the option",
-                            format="$%.2f"
-                        ),
-                        "bid": st.column_config.NumberColumn(
-                            "Bid",
-                            help="Current bid price",
-                            format="$%.2f"
-                        ),
-                        "ask": st.column_config.NumberColumn(
-                            "Ask", 
-                            help="Current ask price",
-                            format="$%.2f"
-                        ),
-                        "lastPrice": st.column_config.NumberColumn(
-                            "Last",
-                            help="Last traded price",
-                            format="$%.2f"
-                        ),
-                    },
+                    _paginate(calls_view, page, page_size),
+                    column_config=_chain_column_config("call"),
                     hide_index=True
                 )
             else:
                 st.info("No call options available")
-                
+
         with col2:
             st.markdown("### Puts")
-            if not puts_df.empty:
+            if not puts_view.empty:
                 st.dataframe(
-                    puts_df,
-                    column_config={
-                        "symbol": None,  # Hide full option symbol
-                        "type": None,    # Hide type since we know these are puts
-                        "OptionCategory": None,  # Hide category
-                        "strikePrice": st.column_config.NumberColumn(
-                            "Strike",
-                            help="Strike price of the option",
-                            format="$%.2f"
-                        ),
-                        "bid": st.column_config.NumberColumn(
-                            "Bid",
-                            help="Current bid price",
-                            format="$%.2f"
-                        ),
-                        "ask": st.column_config.NumberColumn(
-                            "Ask",
-                            help="Current ask price",
-                            format="$%.2f"
-                        ),
-                        "lastPrice": st.column_config.NumberColumn(
-                            "Last",
-                            help="Last traded price",
-                            format="$%.2f"
-                        ),
-                    },
+                    _paginate(puts_view, page, page_size),
+                    column_config=_chain_column_config("put"),
                     hide_index=True
                 )
             else:
                 st.info("No put options available")
 
     except Exception as e:
-        st.error(f"Error fetching options data: {e}")
\ No newline at end of file
+        st.error(f"Error fetching options data: {e}")
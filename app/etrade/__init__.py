@@ -1,4 +1,17 @@
-from .client import get_etrade_session
-from .connector import get_options_chain
+import importlib
 
-__all__ = ['get_etrade_session', 'get_options_chain']
\ No newline at end of file
+# Resolved on first access so `import etrade` doesn't pull in rauth/pandas
+_LAZY_ATTRS = {
+    'get_etrade_session': '.client',
+    'get_options_chain': '.connector',
+}
+
+__all__ = ['get_etrade_session', 'get_options_chain']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
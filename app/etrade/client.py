@@ -4,21 +4,64 @@ import webbrowser
 import json
 import configparser
 import os
-from rauth import OAuth1Service
+import time
+from .market_index import get_expiry_index, get_symbol_index
+from .token_manager import ManagedSession, TokenExpiredError, TokenRenewalError
 
 # Updated paths to look in the etrade directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(os.path.dirname(BASE_DIR), "config.ini")  # config.ini stays in app/
 TOKENS_FILE = os.path.join(BASE_DIR, "tokens.json")  # moved to etrade/tokens.json
 
+# One token-managed session per env, shared across Streamlit reruns
+_managed_sessions = {}
+
+# (mtime, parsed) caches so reruns don't re-read unchanged files
+_config_cache = (None, None)
+_tokens_cache = (None, None)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def read_config():
+    """
+    Return the parsed config.ini, re-reading it only when the file changes.
+    """
+    global _config_cache
+    mtime = _mtime(CONFIG_FILE)
+    if _config_cache[0] != mtime or _config_cache[1] is None:
+        config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
+        _config_cache = (mtime, config)
+    return _config_cache[1]
+
+
+def _read_tokens():
+    """
+    Return the saved tokens dict (or None if there is no tokens file), cached by mtime.
+    """
+    global _tokens_cache
+    mtime = _mtime(TOKENS_FILE)
+    if mtime is None:
+        _tokens_cache = (None, None)
+        return None
+    if _tokens_cache[0] != mtime:
+        with open(TOKENS_FILE, "r") as f:
+            _tokens_cache = (mtime, json.load(f))
+    return _tokens_cache[1]
+
 def get_etrade_session(env="sandbox"):
     """
     Authenticate with E*TRADE and return an OAuth1 session + base_url.
     Saves access tokens to tokens.json for reuse.
     """
 
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = read_config()
 
     consumer_key = config["DEFAULT"]["CONSUMER_KEY"]
     consumer_secret = config["DEFAULT"]["CONSUMER_SECRET"]
@@ -52,6 +95,7 @@ def get_etrade_session(env="sandbox"):
         pass
 
     # Create OAuth1Service
+    from rauth import OAuth1Service
     etrade = OAuth1Service(
         name="etrade",
         consumer_key=consumer_key,
@@ -85,7 +129,8 @@ def get_etrade_session(env="sandbox"):
     # Save tokens for reuse
     tokens = {
         "access_token": session.access_token,
-        "access_secret": session.access_token_secret
+        "access_secret": session.access_token_secret,
+        "issued_at": time.time()
     }
     with open(TOKENS_FILE, "w") as f:
         json.dump(tokens, f, indent=2)
@@ -94,12 +139,34 @@ def get_etrade_session(env="sandbox"):
     return session, base_url
 
 
+def _drop_managed_session(env):
+    managed = _managed_sessions.pop(env, None)
+    if managed is not None:
+        managed.stop()
+
+
+def _record_renewal(managed):
+    """Persist the renewal time so a restarted app knows the token is still active."""
+    try:
+        with open(TOKENS_FILE, "r") as f:
+            tokens = json.load(f)
+        if tokens.get("access_token") != managed.access_token:
+            return
+        tokens["renewed_at"] = managed.last_used
+        with open(TOKENS_FILE, "w") as f:
+            json.dump(tokens, f, indent=2)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+
 def load_saved_session(env="sandbox"):
     """
     Try to load a saved OAuth session from tokens.json. Returns (session, base_url) or (None, None).
+    The session is a ManagedSession that renews the access token in the background before it
+    goes idle. Tokens issued before the last midnight ET are expired, so (None, None) is returned
+    for them straight away instead of failing on the first API call.
     """
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = read_config()
 
     consumer_key = config["DEFAULT"]["CONSUMER_KEY"]
     consumer_secret = config["DEFAULT"]["CONSUMER_SECRET"]
@@ -111,20 +178,38 @@ def load_saved_session(env="sandbox"):
     else:
         raise ValueError("env must be 'sandbox' or 'prod'")
 
-    try:
-        with open(TOKENS_FILE, "r") as f:
-            tokens = json.load(f)
-            from rauth import OAuth1Session
-            session = OAuth1Session(
-                consumer_key,
-                consumer_secret,
-                tokens["access_token"],
-                tokens["access_secret"]
-            )
-            return session, base_url
-    except FileNotFoundError:
+    tokens = _read_tokens()
+    if tokens is None:
+        _drop_managed_session(env)
         return None, None
 
+    managed = _managed_sessions.get(env)
+    if managed is not None and managed.access_token == tokens["access_token"]:
+        if managed.is_expired():
+            return None, None
+        return managed, base_url
+
+    _drop_managed_session(env)
+    from rauth import OAuth1Session
+    session = OAuth1Session(
+        consumer_key,
+        consumer_secret,
+        tokens["access_token"],
+        tokens["access_secret"]
+    )
+    # tokens saved before issued_at was recorded: fall back to the file's mtime
+    issued_at = tokens.get("issued_at") or os.path.getmtime(TOKENS_FILE)
+    if ManagedSession.expired_at(issued_at):
+        return None, None
+    managed = ManagedSession(
+        session, env,
+        issued_at=issued_at,
+        last_used=max(issued_at, tokens.get("renewed_at", 0)),
+        on_renew=_record_renewal
+    )
+    _managed_sessions[env] = managed
+    return managed, base_url
+
 
 def start_auth(env="sandbox"):
     """
@@ -132,8 +217,7 @@ def start_auth(env="sandbox"):
     The caller should store the request token/secret temporarily (for example in Streamlit session_state)
     and then call `complete_auth` with the verifier PIN.
     """
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = read_config()
 
     consumer_key = config["DEFAULT"]["CONSUMER_KEY"]
     consumer_secret = config["DEFAULT"]["CONSUMER_SECRET"]
@@ -149,6 +233,7 @@ def start_auth(env="sandbox"):
     else:
         raise ValueError("env must be 'sandbox' or 'prod'")
 
+    from rauth import OAuth1Service
     etrade = OAuth1Service(
         name="etrade",
         consumer_key=consumer_key,
@@ -172,8 +257,7 @@ def complete_auth(request_token, request_token_secret, verifier, env="sandbox"):
     Complete the OAuth flow given the request token/secret and verifier PIN.
     Saves tokens.json and returns (session, base_url).
     """
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE)
+    config = read_config()
 
     consumer_key = config["DEFAULT"]["CONSUMER_KEY"]
     consumer_secret = config["DEFAULT"]["CONSUMER_SECRET"]
@@ -189,6 +273,7 @@ def complete_auth(request_token, request_token_secret, verifier, env="sandbox"):
     else:
         raise ValueError("env must be 'sandbox' or 'prod'")
 
+    from rauth import OAuth1Service
     etrade = OAuth1Service(
         name="etrade",
         consumer_key=consumer_key,
@@ -207,7 +292,8 @@ def complete_auth(request_token, request_token_secret, verifier, env="sandbox"):
 
     tokens = {
         "access_token": session.access_token,
-        "access_secret": session.access_token_secret
+        "access_secret": session.access_token_secret,
+        "issued_at": time.time()
     }
     with open(TOKENS_FILE, "w") as f:
         json.dump(tokens, f, indent=2)
@@ -215,6 +301,154 @@ def complete_auth(request_token, request_token_secret, verifier, env="sandbox"):
     return session, base_url
 
 
+def lookup_product(session, base_url, search):
+    """
+    Look up securities by ticker or company name prefix. Returns a list of
+    {"symbol", "description", "type"} dicts.
+    Repeating a search already looked up today returns the same results from
+    the local symbol index; otherwise calls /v1/market/lookup and merges the
+    results into the index.
+    """
+    search = search.strip().upper()
+    if not search:
+        return []
+
+    index = get_symbol_index()
+    if index.covers(search):
+        return index.results(search)
+
+    r = session.get(f"{base_url}/v1/market/lookup/{search}.json")
+    if r.status_code == 204:
+        records = []
+    elif r.status_code != 200:
+        raise Exception(f"Error: {r.status_code}, {r.text}")
+    else:
+        records = r.json().get("LookupResponse", {}).get("Data", [])
+    return index.add(search, records)
+
+
+def get_option_expire_dates(session, base_url, symbol):
+    """
+    Return the option expiry dates for symbol as "YYYYMMDD" strings.
+    Dates come from the local expiry index, refreshed from /v1/market/optionexpiredate
+    at most once per day per symbol.
+    """
+    symbol = symbol.strip().upper()
+    index = get_expiry_index()
+    expiries = index.get(symbol)
+    if expiries is not None:
+        return expiries
+
+    r = session.get(f"{base_url}/v1/market/optionexpiredate.json", params={"symbol": symbol})
+    if r.status_code != 200:
+        raise Exception(f"Error: {r.status_code}, {r.text}")
+
+    dates = r.json().get("OptionExpireDateResponse", {}).get("ExpirationDate", [])
+    expiries = sorted(
+        f"{int(d['year']):04d}{int(d['month']):02d}{int(d['day']):02d}"
+        for d in dates
+    )
+    index.put(symbol, expiries)
+    return expiries
+
+
+def get_option_chains(session, base_url, symbol, expiry):
+    """
+    Fetch the option chain for symbol at a "YYYYMMDD" expiry.
+    Returns {"CALL": [...], "PUT": [...]} where each option is the E*TRADE
+    record with its OptionGreeks flattened into the top level.
+    """
+    params = {
+        "symbol": symbol.strip().upper(),
+        "expiryYear": expiry[:4],
+        "expiryMonth": expiry[4:6],
+        "expiryDay": expiry[6:8],
+        "includeWeekly": "true",
+        "skipAdjusted": "true",
+    }
+    r = session.get(f"{base_url}/v1/market/optionchains.json", params=params)
+    if r.status_code != 200:
+        raise Exception(f"Error: {r.status_code}, {r.text}")
+
+    chain = {"CALL": [], "PUT": []}
+    for pair in r.json().get("OptionChainResponse", {}).get("OptionPair", []):
+        for key, side in (("Call", "CALL"), ("Put", "PUT")):
+            opt = pair.get(key)
+            if not opt:
+                continue
+            opt = dict(opt)
+            opt.update(opt.pop("OptionGreeks", {}) or {})
+            chain[side].append(opt)
+    return chain
+
+
+def get_quotes(session, base_url, symbols):
+    """
+    Fetch quotes for up to 25 symbols in one call.
+    Returns {symbol: last_trade_price}.
+    """
+    symbols = [s.strip().upper() for s in symbols if s and s.strip()]
+    quotes = {}
+    for i in range(0, len(symbols), 25):
+        batch = ",".join(symbols[i:i + 25])
+        r = session.get(f"{base_url}/v1/market/quote/{batch}.json")
+        if r.status_code != 200:
+            raise Exception(f"Error: {r.status_code}, {r.text}")
+        for q in r.json().get("QuoteResponse", {}).get("QuoteData", []):
+            sym = q.get("Product", {}).get("symbol")
+            last = q.get("All", {}).get("lastTrade")
+            if sym and last is not None:
+                quotes[sym.upper()] = float(last)
+    return quotes
+
+
+def list_accounts(session, base_url):
+    """
+    List the brokerage accounts for the authenticated user.
+    Returns the E*TRADE Account records (accountIdKey, accountId, accountDesc, ...).
+    """
+    r = session.get(f"{base_url}/v1/accounts/list.json")
+    if r.status_code != 200:
+        raise Exception(f"Error: {r.status_code}, {r.text}")
+    return r.json().get("AccountListResponse", {}).get("Accounts", {}).get("Account", [])
+
+
+def get_account_balance(session, base_url, account_id_key, inst_type="BROKERAGE"):
+    """
+    Fetch the computed balances for an account.
+    Returns the BalanceResponse "Computed" block (cashBuyingPower, marginBuyingPower, ...).
+    """
+    params = {"instType": inst_type, "realTimeNAV": "true"}
+    r = session.get(f"{base_url}/v1/accounts/{account_id_key}/balance.json", params=params)
+    if r.status_code != 200:
+        raise Exception(f"Error: {r.status_code}, {r.text}")
+    return r.json().get("BalanceResponse", {}).get("Computed", {})
+
+
+def get_portfolio_positions(session, base_url, account_id_key, page_size=100):
+    """
+    Fetch every position in an account using the COMPLETE view (includes Greeks/IV).
+    Walks all pages and returns a flat list of E*TRADE Position records.
+    """
+    positions = []
+    page = 1
+    while True:
+        params = {"view": "COMPLETE", "count": page_size, "pageNumber": page}
+        r = session.get(f"{base_url}/v1/accounts/{account_id_key}/portfolio.json", params=params)
+        if r.status_code == 204:
+            break
+        if r.status_code != 200:
+            raise Exception(f"Error: {r.status_code}, {r.text}")
+        response = r.json().get("PortfolioResponse", {})
+        for acct in response.get("AccountPortfolio", []):
+            positions.extend(acct.get("Position", []))
+        total_pages = max((a.get("totalPages", 1) for a in response.get("AccountPortfolio", [])), default=1)
+        if page >= total_pages:
+            break
+        page += 1
+    return positions
+
+
 if __name__ == "__main__":
     s, base_url = get_etrade_session("sandbox")
     # Example: get quotes for AAPL
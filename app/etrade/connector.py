@@ -1,13 +1,16 @@
 # connector.py
 
-import requests
-from requests_oauthlib import OAuth1
 import pandas as pd
-import configparser
-import os
 
-def get_options_chain(session, base_url, symbol="AAPL", expiry="2025-09-19"):
-    """Get options chain data using an authenticated session."""
+def get_options_chain(session, base_url, symbol="AAPL", expiry="2025-09-19",
+                      quality_check=False, drop_bad_quotes=False, today=None):
+    """Get options chain data using an authenticated session.
+
+    With quality_check, rows are annotated with the analytics.chain_quality
+    flags and the per-expiry quality report is attached as df.attrs["quality"];
+    drop_bad_quotes removes flagged rows and today sets the scan's valuation
+    date (defaults to today).
+    """
     url = f"{base_url}/v1/market/optionchains"
     params = {
         "symbol": symbol,
@@ -39,4 +42,12 @@ def get_options_chain(session, base_url, symbol="AAPL", expiry="2025-09-19"):
             "put_iv": put.get("ImpliedVolatility"),
             "put_open_interest": put.get("OpenInterest")
         })
-    return pd.DataFrame(options)
\ No newline at end of file
+    df = pd.DataFrame(options)
+    if not quality_check or df.empty:
+        return df
+
+    from analytics.chain_quality import scan_chain
+    df["expiry"] = expiry
+    df, report = scan_chain(df, today=today, drop=drop_bad_quotes)
+    df.attrs["quality"] = report
+    return df
\ No newline at end of file
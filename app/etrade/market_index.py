@@ -0,0 +1,164 @@
+# market_index.py
+
+import bisect
+import json
+import os
+import threading
+from datetime import date
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXPIRY_INDEX_FILE = os.path.join(BASE_DIR, "expiry_index.json")
+SYMBOL_INDEX_FILE = os.path.join(BASE_DIR, "symbol_index.json")
+
+
+def _load_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ExpiryIndex:
+    """
+    Local index of option expiry dates per symbol.
+    Entries are considered fresh for the calendar day they were fetched on.
+    """
+
+    def __init__(self, path=EXPIRY_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = _load_json(path)
+
+    def get(self, symbol, today=None):
+        """Return today's expiry list for symbol, or None if missing/stale."""
+        today = (today or date.today()).isoformat()
+        entry = self._data.get(symbol.upper())
+        if entry is None or entry.get("fetched") != today:
+            return None
+        return entry["expiries"]
+
+    def put(self, symbol, expiries, today=None):
+        today = (today or date.today()).isoformat()
+        with self._lock:
+            self._data[symbol.upper()] = {"fetched": today, "expiries": list(expiries)}
+            _save_json(self.path, self._data)
+
+
+class SymbolIndex:
+    """
+    Prefix-searchable symbol table built up from product lookups.
+    Each symbol is keyed by its ticker and by every word of its description,
+    held in a sorted list so a prefix search is a pair of bisects.
+    """
+
+    def __init__(self, path=SYMBOL_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        data = _load_json(path)
+        self._symbols = data.get("symbols", {})
+        self._queries = data.get("queries", {})
+        self._keys = []
+        self._rebuild_keys()
+
+    def _rebuild_keys(self):
+        keys = set()
+        for sym, info in self._symbols.items():
+            keys.add((sym, sym))
+            for word in info.get("description", "").upper().split():
+                keys.add((word, sym))
+        self._keys = sorted(keys)
+
+    def _query(self, query):
+        entry = self._queries.get(query.upper())
+        # older index files stored just the lookup date
+        return entry if isinstance(entry, dict) else None
+
+    def covers(self, query, today=None):
+        """True if this exact query was looked up today.
+
+        A shorter prefix doesn't count: product lookup returns a capped,
+        relevance-ranked list, so "A" says nothing about whether "AMZN" is known.
+        """
+        today = (today or date.today()).isoformat()
+        entry = self._query(query)
+        return entry is not None and entry.get("date") == today
+
+    def results(self, query):
+        """Return the records the last lookup of this exact query returned, in API order."""
+        entry = self._query(query)
+        if entry is None:
+            return []
+        return [self._symbols[sym] for sym in entry.get("symbols", []) if sym in self._symbols]
+
+    def _prefix_matches(self, prefix):
+        lo = bisect.bisect_left(self._keys, (prefix,))
+        hi = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        return {sym for _, sym in self._keys[lo:hi]}
+
+    def search(self, prefix, limit=25):
+        """Return up to `limit` symbol records matching prefix.
+
+        Each word of prefix must start the ticker or a description word, so
+        "APPLE INC" and "micro dev" match like "AAPL" does.
+        """
+        prefix = prefix.upper()
+        words = prefix.split()
+        if not words:
+            return []
+        matches = self._prefix_matches(words[0])
+        for word in words[1:]:
+            matches &= self._prefix_matches(word)
+        # exact ticker match first, then alphabetical
+        ordered = sorted(matches, key=lambda sym: (sym != prefix, sym))
+        return [self._symbols[sym] for sym in ordered[:limit]]
+
+    def add(self, query, records, today=None):
+        """Merge lookup results for query into the table and persist it.
+
+        Returns the records normalised to {"symbol", "description", "type"}.
+        """
+        today = (today or date.today()).isoformat()
+        added = []
+        with self._lock:
+            for rec in records:
+                sym = rec.get("symbol", "").upper()
+                if not sym:
+                    continue
+                self._symbols[sym] = {
+                    "symbol": sym,
+                    "description": rec.get("description", ""),
+                    "type": rec.get("type", ""),
+                }
+                added.append(self._symbols[sym])
+            self._queries[query.upper()] = {"date": today, "symbols": [r["symbol"] for r in added]}
+            self._rebuild_keys()
+            _save_json(self.path, {"symbols": self._symbols, "queries": self._queries})
+        return added
+
+
+_expiry_index = None
+_symbol_index = None
+
+
+def get_expiry_index():
+    """Return the process-wide ExpiryIndex, loading it from disk on first use."""
+    global _expiry_index
+    if _expiry_index is None:
+        _expiry_index = ExpiryIndex()
+    return _expiry_index
+
+
+def get_symbol_index():
+    """Return the process-wide SymbolIndex, loading it from disk on first use."""
+    global _symbol_index
+    if _symbol_index is None:
+        _symbol_index = SymbolIndex()
+    return _symbol_index
@@ -0,0 +1,176 @@
+# token_manager.py
+
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# E*TRADE access tokens go inactive after 2 hours without use and expire
+# outright at midnight US Eastern. Inactive tokens can be reactivated with
+# renew_access_token; expired ones need the full PIN flow again.
+IDLE_LIMIT = 2 * 60 * 60
+RENEW_MARGIN = 15 * 60      # renew this long before the idle limit is reached
+CHECK_INTERVAL = 60         # background thread wake-up period
+RENEW_WAIT = 15             # seconds a request waits for an in-flight renewal
+EASTERN = ZoneInfo("America/New_York")
+
+RENEW_URLS = {
+    "sandbox": "https://apisb.etrade.com/oauth/renew_access_token",
+    "prod": "https://api.etrade.com/oauth/renew_access_token",
+}
+
+
+# oauth_problem values that mean the token is gone for good
+FATAL_PROBLEMS = ("token_expired", "token_revoked")
+
+
+class TokenExpiredError(Exception):
+    """Raised when the access token has expired and the PIN flow is required."""
+
+
+class TokenRenewalError(Exception):
+    """Raised when a token couldn't be renewed right now (network error, timeout); retry later."""
+
+
+def next_expiry(issued_at):
+    """Return the epoch time of the first midnight US Eastern after issued_at."""
+    issued = datetime.fromtimestamp(issued_at, EASTERN)
+    midnight = datetime.combine(issued.date() + timedelta(days=1), datetime.min.time(), EASTERN)
+    return midnight.timestamp()
+
+
+def _token_problem(response):
+    """Return the oauth_problem reported by a 401 response, or None."""
+    if response.status_code != 401:
+        return None
+    text = response.text or ""
+    for problem in ("token_expired", "token_rejected", "token_revoked"):
+        if problem in text:
+            return problem
+    return "unauthorized"
+
+
+class ManagedSession:
+    """
+    Wraps an OAuth1 session and keeps its access token alive.
+    Exposes get/post/put/delete like the underlying session, so callers keep
+    using `session.get(url, params=...)` unchanged.
+    """
+
+    def __init__(self, session, env="sandbox", issued_at=None, last_used=None, on_renew=None):
+        self.session = session
+        self.env = env
+        self.issued_at = issued_at or time.time()
+        self.expires_at = next_expiry(self.issued_at)
+        self.last_used = last_used or time.time()
+        self.on_renew = on_renew
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready.set()
+        self._expired = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._keepalive, name=f"etrade-token-{env}", daemon=True)
+        self._thread.start()
+
+    # --- lifecycle ---
+
+    @property
+    def access_token(self):
+        return self.session.access_token
+
+    @property
+    def access_token_secret(self):
+        return self.session.access_token_secret
+
+    @staticmethod
+    def expired_at(issued_at, now=None):
+        """True if a token issued at issued_at is past its midnight ET expiry."""
+        return (now or time.time()) >= next_expiry(issued_at)
+
+    def is_expired(self, now=None):
+        return self._expired or (now or time.time()) >= self.expires_at
+
+    def idle_seconds(self, now=None):
+        return (now or time.time()) - self.last_used
+
+    def stop(self):
+        self._stop.set()
+
+    def renew(self):
+        """
+        Call renew_access_token. Requests issued meanwhile wait on the renewal
+        rather than failing. Returns True on success. The session is only
+        marked expired past midnight ET or when E*TRADE reports the token as
+        expired/revoked; other failures leave it usable for a later retry.
+        """
+        with self._lock:
+            if self.is_expired():
+                self._expired = True
+                return False
+            self._ready.clear()
+            try:
+                r = self.session.get(RENEW_URLS[self.env])
+                ok = r.status_code == 200
+                if ok:
+                    self.last_used = time.time()
+                    if self.on_renew:
+                        self.on_renew(self)
+                elif _token_problem(r) in FATAL_PROBLEMS:
+                    self._expired = True
+                return ok
+            except Exception:
+                return False
+            finally:
+                self._ready.set()
+
+    def _keepalive(self):
+        # Check immediately so a token that went idle while the app was down
+        # is renewed before the first request needs it
+        while True:
+            if self.is_expired():
+                self._expired = True
+                return
+            if self.idle_seconds() >= IDLE_LIMIT - RENEW_MARGIN:
+                self.renew()
+            if self._stop.wait(CHECK_INTERVAL):
+                return
+
+    # --- requests ---
+
+    def request(self, method, url, **kwargs):
+        if not self._ready.wait(RENEW_WAIT):
+            raise TokenRenewalError("Timed out waiting for E*TRADE token renewal; try again")
+        if self.is_expired():
+            raise TokenExpiredError("E*TRADE access token expired at midnight ET; re-authorize")
+
+        r = self.session.request(method, url, **kwargs)
+        problem = _token_problem(r)
+        if problem is None:
+            self.last_used = time.time()
+            return r
+
+        # Token went inactive (or renewal raced the idle limit): renew once and retry
+        if problem not in FATAL_PROBLEMS and self.renew():
+            r = self.session.request(method, url, **kwargs)
+            problem = _token_problem(r)
+            if problem is None:
+                self.last_used = time.time()
+                return r
+        if problem in FATAL_PROBLEMS:
+            self._expired = True
+        if self.is_expired():
+            raise TokenExpiredError(f"E*TRADE rejected the access token ({problem}); re-authorize")
+        raise TokenRenewalError(f"E*TRADE rejected the request ({problem}) and renewal did not help; try again")
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
@@ -0,0 +1,29 @@
+"""LLM helpers for the AI Financial Assistant.
+
+This package contains the chat backends, prompt assembly and conversation memory used by the chat interface.
+Backends are imported on first use so the app can render before numpy/requests are loaded.
+"""
+import importlib
+
+from .memory import ConversationMemory, chain_passage, chain_preview, estimate_tokens
+
+_LAZY_ATTRS = {
+    'BackendUnavailable': '.backends',
+    'LLMBackend': '.backends',
+    'OllamaBackend': '.backends',
+    'TransformersQABackend': '.backends',
+    'route_question': '.backends',
+}
+
+__all__ = [
+    'BackendUnavailable', 'LLMBackend', 'OllamaBackend', 'TransformersQABackend', 'route_question',
+    'ConversationMemory', 'chain_passage', 'chain_preview', 'estimate_tokens',
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,377 @@
+"""Pluggable LLM backends for the chat interface.
+
+OllamaBackend streams generations from a local Ollama server. TransformersQABackend
+answers extractive questions against the chain summary with a CPU
+question-answering model that is loaded once per process and serves concurrent
+requests in micro-batches. route_question picks between them.
+"""
+import inspect
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+import requests
+
+OLLAMA_API_URL = "http://localhost:11434/api/generate"
+OLLAMA_MODEL = "llama3"
+QA_MODEL = "distilbert-base-cased-distilled-squad"
+ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_financial", "onnx")
+
+MAX_SEQ_LEN = 384
+DOC_STRIDE = 128
+MAX_ANSWER_TOKENS = 30
+
+# Short lookup-style questions the extractive model handles well
+_EXTRACTIVE_START = re.compile(r"^\s*(what|which|when|where|who|how (much|many|high|low))\b", re.I)
+_GENERATIVE_WORDS = re.compile(
+    r"\b(why|should|recommend|strategy|explain|compare|best|worth|risk|outlook|think)\b", re.I
+)
+
+
+class BackendUnavailable(Exception):
+    """Raised when a backend cannot serve a request (server down, model missing)."""
+
+
+class LLMBackend:
+    """Interface for chat backends.
+
+    generate() yields text chunks. Backends use whichever inputs suit them:
+    generative models take the fully assembled prompt, extractive ones take
+    the raw question and context.
+    """
+
+    name = "base"
+
+    def available(self):
+        return True
+
+    def generate(self, prompt, question=None, context=None):
+        raise NotImplementedError
+
+
+class OllamaBackend(LLMBackend):
+    """Streams completions from a local Ollama server over HTTP."""
+
+    name = "ollama"
+
+    def __init__(self, api_url=OLLAMA_API_URL, model=OLLAMA_MODEL, probe_ttl=5.0):
+        self.api_url = api_url
+        self.model = model
+        self.probe_ttl = probe_ttl
+        self._probe = (0.0, False)
+
+    def available(self):
+        """Cheap liveness probe, cached for probe_ttl seconds."""
+        checked_at, ok = self._probe
+        if time.monotonic() - checked_at < self.probe_ttl:
+            return ok
+        tags_url = self.api_url.rsplit("/api/", 1)[0] + "/api/tags"
+        try:
+            ok = requests.get(tags_url, timeout=0.5).status_code == 200
+        except requests.RequestException:
+            ok = False
+        self._probe = (time.monotonic(), ok)
+        return ok
+
+    def generate(self, prompt, question=None, context=None):
+        try:
+            response = requests.post(
+                self.api_url,
+                json={"model": self.model, "prompt": prompt, "stream": True},
+                stream=True
+            )
+        except requests.RequestException as e:
+            self._probe = (time.monotonic(), False)
+            raise BackendUnavailable(f"Ollama is not reachable at {self.api_url}: {e}")
+        try:
+            for line in response.iter_lines():
+                if line:
+                    data = json.loads(line.decode("utf-8"))
+                    if "response" in data:
+                        yield data["response"]
+        except requests.RequestException as e:
+            self._probe = (time.monotonic(), False)
+            raise BackendUnavailable(f"Ollama stopped responding: {e}")
+
+    def complete(self, prompt, timeout=120):
+        """Non-streaming completion, e.g. for the chat memory's summarizer."""
+        response = requests.post(
+            self.api_url,
+            json={"model": self.model, "prompt": prompt, "stream": False},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json().get("response", "")
+
+
+class _QARuntime:
+    """Tokenizer plus model (PyTorch or ONNX Runtime) for extractive QA."""
+
+    def __init__(self, model_name, quantize=False, onnx=False):
+        from transformers import AutoModelForQuestionAnswering, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForQuestionAnswering.from_pretrained(model_name)
+        model.eval()
+        # e.g. DistilBERT takes no token_type_ids even if its tokenizer emits them
+        accepted = inspect.signature(model.forward).parameters
+        self.input_names = [n for n in self.tokenizer.model_input_names if n in accepted]
+
+        self.session = None
+        self.model = None
+        if onnx:
+            self.session = self._onnx_session(model_name, model)
+        else:
+            import torch
+            if quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+
+    def _onnx_session(self, model_name, model):
+        import onnxruntime as ort
+        import torch
+
+        path = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__") + ".onnx")
+        if not os.path.exists(path):
+            os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+            dummy = self.tokenizer("question", "context", return_tensors="pt")
+            dynamic = {n: {0: "batch", 1: "seq"} for n in self.input_names}
+            dynamic.update({"start_logits": {0: "batch", 1: "seq"}, "end_logits": {0: "batch", 1: "seq"}})
+            torch.onnx.export(
+                model, (), path,
+                kwargs={n: dummy[n] for n in self.input_names},
+                input_names=self.input_names,
+                output_names=["start_logits", "end_logits"],
+                dynamic_axes=dynamic,
+                opset_version=17,
+                dynamo=False,
+            )
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def _logits(self, features):
+        if self.session is not None:
+            feeds = {n: features[n].astype(np.int64) for n in self.input_names}
+            start, end = self.session.run(["start_logits", "end_logits"], feeds)
+            return start, end
+        import torch
+        with torch.inference_mode():
+            out = self.model(**{n: torch.from_numpy(features[n]) for n in self.input_names})
+        return out.start_logits.numpy(), out.end_logits.numpy()
+
+    def answer_batch(self, pairs):
+        """Answer a list of (question, context) pairs in one forward pass."""
+        questions = [q for q, _ in pairs]
+        contexts = [c for _, c in pairs]
+        features = self.tokenizer(
+            questions, contexts,
+            truncation="only_second",
+            max_length=MAX_SEQ_LEN,
+            stride=DOC_STRIDE,
+            return_overflowing_tokens=True,
+            return_offsets_mapping=True,
+            padding=True,
+            return_tensors="np",
+        )
+        start_logits, end_logits = self._logits(features)
+        sample_map = features["overflow_to_sample_mapping"]
+        offsets = features["offset_mapping"]
+
+        best = [{"answer": "", "score": 0.0} for _ in pairs]
+        band = np.triu(np.tril(np.ones((start_logits.shape[1],) * 2, dtype=bool), MAX_ANSWER_TOKENS - 1))
+        for i in range(len(sample_map)):
+            seq_ids = features.sequence_ids(i)
+            is_ctx = np.array([s == 1 for s in seq_ids], dtype=bool)
+            start = np.where(is_ctx, start_logits[i], -np.inf)
+            end = np.where(is_ctx, end_logits[i], -np.inf)
+            start_p = np.exp(start - start.max())
+            start_p /= start_p.sum()
+            end_p = np.exp(end - end.max())
+            end_p /= end_p.sum()
+            scores = np.where(band, np.outer(start_p, end_p), 0.0)
+            s, e = np.unravel_index(np.argmax(scores), scores.shape)
+            score = float(scores[s, e])
+            sample = int(sample_map[i])
+            if score > best[sample]["score"]:
+                char_start, char_end = offsets[i][s][0], offsets[i][e][1]
+                best[sample] = {
+                    "answer": contexts[sample][char_start:char_end],
+                    "score": score,
+                }
+        return best
+
+
+_runtimes = {}
+_runtimes_lock = threading.Lock()
+
+
+def _get_runtime(model_name, quantize, onnx):
+    """Process-wide runtime cache so the model is loaded exactly once."""
+    key = (model_name, quantize, onnx)
+    with _runtimes_lock:
+        if key not in _runtimes:
+            try:
+                _runtimes[key] = _QARuntime(model_name, quantize=quantize, onnx=onnx)
+            except Exception as e:
+                # ImportError, OSError from download/load, ONNX export errors, ...
+                raise BackendUnavailable(f"Could not load QA model {model_name}: {e}") from e
+        return _runtimes[key]
+
+
+class TransformersQABackend(LLMBackend):
+    """Extractive question answering on CPU with micro-batching.
+
+    Concurrent ask() calls are queued and a single worker thread runs them
+    through the model in batches of up to max_batch, waiting at most
+    batch_window seconds to fill a batch. The backend reports itself
+    available only once the model is loaded; call warm_up(background=True)
+    at startup so routing can use it by the first question.
+
+    Args:
+        model_name: Hugging Face question-answering model
+        quantize: Apply dynamic int8 quantization to Linear layers (PyTorch path)
+        onnx: Export to ONNX once and serve with ONNX Runtime instead of PyTorch
+        max_batch: Largest batch sent to the model
+        batch_window: Seconds to wait for more requests before running a batch
+    """
+
+    name = "transformers-qa"
+
+    def __init__(self, model_name=QA_MODEL, quantize=False, onnx=False, max_batch=8, batch_window=0.005):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.onnx = onnx
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._loader = None
+        self.load_error = None
+
+    @property
+    def runtime(self):
+        return _get_runtime(self.model_name, self.quantize, self.onnx)
+
+    @property
+    def loaded(self):
+        return (self.model_name, self.quantize, self.onnx) in _runtimes
+
+    def warm_up(self, background=False):
+        """Load the model (and run one tiny batch) ahead of the first request.
+
+        With background=True the load runs on a daemon thread, which is
+        returned; failures are kept in `load_error` instead of raised.
+        """
+        if not background:
+            self.runtime.answer_batch([("What is the strike?", "The strike is 100.")])
+            self.load_error = None
+            return None
+        with self._worker_lock:
+            if self._loader is None or not self._loader.is_alive():
+                self._loader = threading.Thread(target=self._warm_up_quietly, name="qa-loader", daemon=True)
+                self._loader.start()
+            return self._loader
+
+    def _warm_up_quietly(self):
+        try:
+            self.warm_up()
+        except Exception as e:
+            self.load_error = BackendUnavailable(str(e))
+
+    def available(self):
+        """True once the model is loaded; starts a background load the first time."""
+        if self.loaded:
+            return True
+        if self.load_error is None:
+            self.warm_up(background=True)
+        return False
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._serve, name="qa-batcher", daemon=True)
+                self._worker.start()
+
+    def _serve(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # skip requests whose caller already gave up (ask() timed out)
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.runtime.answer_batch([pair for pair, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def ask(self, question, context, timeout=60):
+        """Answer one question; batched with any concurrent callers."""
+        if not context:
+            raise BackendUnavailable("Extractive QA needs data context (upload or load a chain first)")
+        self._ensure_worker()
+        future = Future()
+        self._queue.put(((question, context), future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise BackendUnavailable(f"QA model did not answer within {timeout}s")
+        except BackendUnavailable:
+            raise
+        except Exception as e:
+            raise BackendUnavailable(f"QA model failed: {e}") from e
+
+    def generate(self, prompt, question=None, context=None):
+        result = self.ask(question or prompt, context)
+        if not result["answer"].strip():
+            yield "I couldn't find that in the loaded options data."
+        else:
+            yield f"{result['answer'].strip()} (confidence {result['score']:.0%})"
+
+
+def is_extractive_question(question):
+    """Heuristic: short lookup questions go to the extractive model."""
+    words = question.split()
+    return (
+        len(words) <= 15
+        and bool(_EXTRACTIVE_START.match(question))
+        and not _GENERATIVE_WORDS.search(question)
+    )
+
+
+def route_question(question, context, generative, extractive):
+    """Pick a backend for a question.
+
+    Cheap lookup questions with data context go to the extractive backend;
+    everything else goes to the generative backend, falling back to the
+    extractive one when the generative server is down.
+
+    Returns:
+        LLMBackend or None if neither can serve the question
+    """
+    if context and is_extractive_question(question) and extractive.available():
+        return extractive
+    if generative.available():
+        return generative
+    if context and extractive.available():
+        return extractive
+    return None
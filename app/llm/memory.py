@@ -0,0 +1,225 @@
+"""Bounded conversation memory for the chat interface.
+
+Recent turns are kept verbatim, older turns are folded into a rolling summary
+by a background worker, and prompts are assembled within a fixed token budget.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Rough chars-per-token ratio for English text on llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "options-trading assistant. Update the summary with the new turns below. "
+    "Keep tickers, strikes, expiries, numbers and decisions; drop pleasantries. "
+    "Reply with the updated summary only, in at most {max_words} words.\n\n"
+    "Current summary:\n{summary}\n\nNew turns:\n{turns}\n\nUpdated summary:"
+)
+
+PART_SEPARATOR = "\n\n"
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+TURNS_HEADER = "Recent conversation:\n"
+CONTEXT_HEADER = "Here is the relevant options data:\n"
+ANALYZE_TRAILER = "Analyze this data and answer the user's question."
+
+
+def estimate_tokens(text):
+    """Cheap token estimate used for budgeting (no tokenizer dependency)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _truncate_to_tokens(text, max_tokens, keep="head"):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ""
+    if keep == "tail":
+        return "…" + text[-(max_chars - 1):]
+    return text[:max_chars - 1] + "…"
+
+
+def chain_preview(options_chain, rows=30):
+    """Text preview of an options chain used as prompt context."""
+    if options_chain is None:
+        return None
+    return options_chain.head(rows).to_string(index=False)
+
+
+def chain_passage(options_chain, rows=50):
+    """Sentence-style rendering of an options chain for extractive QA models.
+
+    Extractive models read running text far better than fixed-width tables,
+    so each row becomes "Strike 100.0: call bid 1.2, call ask 1.3, ...".
+    """
+    if options_chain is None:
+        return None
+    head = options_chain.head(rows)
+    key = "strike" if "strike" in head.columns else head.columns[0]
+    others = [c for c in head.columns if c != key]
+    sentences = []
+    for record in head.to_dict("records"):
+        fields = ", ".join(f"{c.replace('_', ' ')} {record[c]}" for c in others)
+        sentences.append(f"{key.replace('_', ' ').capitalize()} {record[key]}: {fields}.")
+    return " ".join(sentences)
+
+
+def _format_turns(turns):
+    return "\n".join(f"{role}: {text}" for role, text in turns)
+
+
+class ConversationMemory:
+    """Chat transcript plus bounded model context.
+
+    Args:
+        summarize_fn: Callable taking a prompt string and returning summary text.
+            Runs on a background thread; if it is None or fails, older turns are
+            kept as a truncated extract instead.
+        max_prompt_tokens: Token budget for the assembled prompt.
+        recent_turns: Number of most recent turns kept verbatim.
+        summary_tokens: Upper bound on the rolling summary length.
+        max_transcript: Number of turns retained for display.
+    """
+
+    def __init__(self, summarize_fn=None, max_prompt_tokens=3000, recent_turns=6,
+                 summary_tokens=400, max_transcript=200):
+        self.summarize_fn = summarize_fn
+        self.max_prompt_tokens = max_prompt_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self.max_transcript = max_transcript
+
+        self.transcript = []   # (role, text) shown in the UI
+        self.summary = ""
+        self._recent = []      # verbatim turns sent to the model
+        self._pending = []     # evicted turns not yet folded into the summary
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+        self._summarizing = False
+
+    def __getstate__(self):
+        # session_state may try to pickle; drop the executor and lock
+        state = self.__dict__.copy()
+        state.pop("_executor", None)
+        state.pop("_lock", None)
+        state["_summarizing"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+
+    def add(self, role, text):
+        """Record a turn; evicts old turns into the summary queue when needed."""
+        with self._lock:
+            self.transcript.append((role, text))
+            del self.transcript[:-self.max_transcript]
+            self._recent.append((role, text))
+            overflow = len(self._recent) - self.recent_turns
+            if overflow > 0:
+                self._pending.extend(self._recent[:overflow])
+                del self._recent[:overflow]
+            schedule = bool(self._pending) and not self._summarizing
+            if schedule:
+                self._summarizing = True
+        if schedule:
+            self._executor.submit(self._summarize_pending)
+
+    def clear(self):
+        with self._lock:
+            self.transcript.clear()
+            self._recent.clear()
+            self._pending.clear()
+            self.summary = ""
+
+    def _summarize_pending(self):
+        # Loops until the queue is drained so turns added mid-run are picked up
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._summarizing = False
+                    return
+                batch = list(self._pending)
+                summary = self.summary
+
+            updated = None
+            if self.summarize_fn is not None:
+                prompt = SUMMARY_PROMPT.format(
+                    max_words=self.summary_tokens * 3 // 4,
+                    summary=summary or "(empty)",
+                    turns=_format_turns(batch),
+                )
+                try:
+                    updated = (self.summarize_fn(prompt) or "").strip()
+                except Exception:
+                    updated = None
+            if not updated:
+                # Fallback: keep the most recent part of the raw text
+                updated = "\n".join(filter(None, [summary, _format_turns(batch)]))
+
+            with self._lock:
+                self.summary = _truncate_to_tokens(updated, self.summary_tokens, keep="tail")
+                # clear() may have run meanwhile; only drop what is still queued
+                if self._pending[:len(batch)] == batch:
+                    del self._pending[:len(batch)]
+                else:
+                    self.summary = ""
+
+    def build_prompt(self, user_input, context=None, context_tokens=None):
+        """Assemble a prompt for the model within `max_prompt_tokens`.
+
+        Priority order: the question (truncated if it alone exceeds the
+        budget), the data context, the rolling summary, then as many recent
+        turns (newest first) as still fit.
+
+        Args:
+            user_input: The user's current question.
+            context: Optional data context (e.g. an options chain preview).
+            context_tokens: Cap for the context block; defaults to half the budget.
+        """
+        with self._lock:
+            summary = self.summary
+            # evicted-but-unsummarised turns are older than the recent ones
+            history = list(self._pending) + list(self._recent)
+
+        # Every emitted part is charged, including headers and the "\n\n"
+        # separators, so estimate_tokens(prompt) never exceeds the budget
+        sep = estimate_tokens(PART_SEPARATOR)
+
+        def cost(part):
+            return estimate_tokens(part) + sep
+
+        budget = self.max_prompt_tokens
+        question = _truncate_to_tokens(f"User question: {user_input}", budget - sep)
+        budget -= cost(question)
+
+        context_block = ""
+        if context:
+            cap = min(context_tokens or self.max_prompt_tokens // 2, budget - cost(ANALYZE_TRAILER) - sep)
+            if cap > estimate_tokens(CONTEXT_HEADER):
+                context_block = _truncate_to_tokens(CONTEXT_HEADER + context, cap)
+                budget -= cost(context_block) + cost(ANALYZE_TRAILER)
+
+        summary_block = ""
+        room = budget - cost(SUMMARY_HEADER)
+        if summary and room > 0:
+            summary_block = SUMMARY_HEADER + _truncate_to_tokens(summary, room, keep="tail")
+            budget -= cost(summary_block)
+
+        kept = []
+        budget -= cost(TURNS_HEADER)
+        for role, text in reversed(history):
+            line = f"{role}: {text}"
+            line_cost = estimate_tokens(line) + 1  # newline
+            if line_cost > budget:
+                break
+            kept.append(line)
+            budget -= line_cost
+        turns_block = (TURNS_HEADER + "\n".join(reversed(kept))) if kept else ""
+
+        parts = [summary_block, turns_block, context_block, question]
+        if context_block:
+            parts.append(ANALYZE_TRAILER)
+        return PART_SEPARATOR.join(p for p in parts if p)
@@ -1,32 +1,49 @@
+import startup_profile
+startup_profile.start()
+
 import streamlit as st
-import requests
-import json
-import pandas as pd
-from etrade import get_options_chain
 import etrade.client as etrade_client
+from llm import ConversationMemory, chain_passage, chain_preview
 import webbrowser
 import os
 
+# Heavy modules (pandas, analytics, LLM backends) are imported inside the
+# panels that use them so the page renders before they load.
+startup_profile.mark("imports")
+
 # --- Config ---
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "llama3"  # change if you want another model
+QA_MODEL = "distilbert-base-cased-distilled-squad"  # extractive model for quick lookups
+HISTORY_PAGE = 10  # chat messages rendered per "show older" step
+
+# --- LLM backends (created once per process) ---
+@st.cache_resource
+def get_backends():
+    from llm import OllamaBackend, TransformersQABackend
+    qa_backend = TransformersQABackend(QA_MODEL)
+    # Load the QA model off the script thread; it is routed to once loaded
+    qa_backend.warm_up(background=True)
+    return OllamaBackend(OLLAMA_API_URL, OLLAMA_MODEL), qa_backend
+
+def summarize_history(prompt):
+    """Chat memory summarizer; resolves the Ollama backend only when first needed."""
+    return get_backends()[0].complete(prompt)
+
+def etrade_get(session, url, **kwargs):
+    """session.get that sends the user back to the authorization flow once the token is gone.
 
-# --- Function to query Ollama ---
-def query_ollama(prompt):
-    response = requests.post(
-        OLLAMA_API_URL,
-        json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": True},
-        stream=True
-    )
-    collected = ""
-    for line in response.iter_lines():
-        if line:
-            data = json.loads(line.decode("utf-8"))
-            if "response" in data:
-                chunk = data["response"]
-                collected += chunk
-                yield chunk
-    return collected
+    Returns the response, or None if the request failed (the error is shown).
+    """
+    try:
+        return session.get(url, **kwargs)
+    except etrade_client.TokenExpiredError as e:
+        # load_saved_session returns no session after this, so the rerun shows the auth UI
+        st.session_state.etrade_auth_error = str(e)
+        st.rerun()
+    except etrade_client.TokenRenewalError as e:
+        st.error(f"E*TRADE request failed: {e}")
+    return None
 
 # --- Streamlit UI ---
 st.set_page_config(page_title="AI Financial Assistant", layout="wide")
@@ -88,9 +105,10 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+startup_profile.mark("first render")
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+if "chat_memory" not in st.session_state:
+    st.session_state.chat_memory = ConversationMemory(summarize_fn=summarize_history)
 
 # Create three columns for the main layout
 col1, col2, col3 = st.columns([1, 1, 1])
@@ -103,6 +121,8 @@ with col1:
 
     if session is None:
         st.warning("E*TRADE not authenticated. Please authorize to enable market calls.")
+        if st.session_state.get("etrade_auth_error"):
+            st.error(f"E*TRADE session ended: {st.session_state.pop('etrade_auth_error')}")
 
         if "etrade_oauth" not in st.session_state:
             st.session_state.etrade_oauth = {}
@@ -174,8 +194,10 @@ with col1:
             st.error("No authenticated E*TRADE session. Please authorize first.")
         else:
             url = f"{base_url}/v1/market/quote/{ticker}.json"
-            r = session.get(url)
-            if r.status_code == 200:
+            r = etrade_get(session, url)
+            if r is None:
+                pass
+            elif r.status_code == 200:
                 data = r.json()
                 st.json(data)
             else:
@@ -185,19 +207,24 @@ with col2:
     st.subheader("Options Chain")
     expiry = st.text_input("Expiry date (YYYY-MM-DD):", "2025-09-19")
     if st.button("Get E*TRADE Option Chain"):
-        url = f"{base_url}/v1/market/optionchains.json"
-        params = {"symbol": ticker, "expiryDate": expiry}
-        r = session.get(url, params=params)
-        if r.status_code == 200:
-            data = r.json()
-            if "OptionChainResponse" in data and "OptionPair" in data["OptionChainResponse"]:
-                options_data = data["OptionChainResponse"]["OptionPair"]
-                # Convert to DataFrame for better display
-                st.json(data)  # For now showing raw data, can be improved to show as table
-            else:
-                st.warning("No options data available")
+        if session is None:
+            st.error("No authenticated E*TRADE session. Please authorize first.")
         else:
-            st.error(f"Failed to fetch option chain: {r.status_code} {r.text}")
+            url = f"{base_url}/v1/market/optionchains.json"
+            params = {"symbol": ticker, "expiryDate": expiry}
+            r = etrade_get(session, url, params=params)
+            if r is None:
+                pass
+            elif r.status_code == 200:
+                data = r.json()
+                if "OptionChainResponse" in data and "OptionPair" in data["OptionChainResponse"]:
+                    options_data = data["OptionChainResponse"]["OptionPair"]
+                    # Convert to DataFrame for better display
+                    st.json(data)  # For now showing raw data, can be improved to show as table
+                else:
+                    st.warning("No options data available")
+            else:
+                st.error(f"Failed to fetch option chain: {r.status_code} {r.text}")
 
 with col3:
     st.subheader("Upload Custom Data")
@@ -207,7 +234,21 @@ with col3:
 
     if uploaded_file is not None:
         try:
+            import pandas as pd
+            from analytics.chain_quality import scan_chain
             options_chain = pd.read_csv(uploaded_file)
+            # Drop bad quotes / arbitrage violations before they reach the prompt
+            if {"strike", "call_bid", "call_ask", "put_bid", "put_ask"}.issubset(options_chain.columns):
+                original_columns = list(options_chain.columns)
+                options_chain, quality = scan_chain(options_chain, drop=True)
+                options_chain = options_chain[original_columns]
+                st.caption(
+                    "Data quality: "
+                    + ", ".join(f"{exp or 'chain'} {score:.0%}" for exp, score in quality["quality_score"].items())
+                    + f" ({int(quality['flagged_rows'].sum())} rows dropped)"
+                    + (f"; skipped for missing data: {', '.join(quality.attrs['skipped_checks'])}"
+                       if quality.attrs.get("skipped_checks") else "")
+                )
             st.write("Preview:")
             st.dataframe(options_chain.head(5))
         except Exception as e:
@@ -216,27 +257,62 @@ with col3:
 # Chat interface below the three columns
 st.markdown("---")  # Add a visual separator
 st.subheader("AI Chat Interface")
-user_input = st.text_area("Your question about the data:", height=100)
+# Typing a first question starts loading the local QA model in the background,
+# so sessions that never use chat don't pay for torch/transformers
+user_input = st.text_area("Your question about the data:", height=100, on_change=get_backends)
 
 if st.button("Send"):
     if user_input.strip():
-        # If options chain is uploaded, summarize + add to prompt
-        if options_chain is not None:
-            summary = options_chain.head(30).to_string(index=False)
-            prompt = f"User question: {user_input}\n\nHere is a preview of the uploaded options chain:\n{summary}\n\nAnalyze this chain and answer the user's question."
+        from llm import BackendUnavailable, route_question
+        memory = st.session_state.chat_memory
+        ollama_backend, qa_backend = get_backends()
+        # If options chain is uploaded, send a preview as context within the prompt budget
+        context = chain_preview(options_chain)
+        prompt = memory.build_prompt(user_input, context=context)
+        backend = route_question(user_input, context, ollama_backend, qa_backend)
+
+        if backend is None:
+            if qa_backend.load_error is not None:
+                local = f"The local model failed to load ({qa_backend.load_error})."
+            elif context and not qa_backend.loaded:
+                local = "The local model is still loading; try again in a moment."
+            else:
+                local = "Upload an options chain to ask quick lookup questions with the local model."
+            st.error(f"Ollama is not reachable. Start it with `ollama serve`. {local}")
         else:
-            prompt = user_input
-
-        st.session_state.chat_history.append(("You", user_input))
-        st.write("**AI:** ")
-        placeholder = st.empty()
-        ai_reply = ""
-        for chunk in query_ollama(prompt):
-            ai_reply += chunk
-            placeholder.markdown(ai_reply)
-        st.session_state.chat_history.append(("AI", ai_reply))
-
-if st.session_state.chat_history:
+            memory.add("You", user_input)
+            st.write(f"**AI** ({backend.name}): ")
+            placeholder = st.empty()
+            ai_reply = ""
+            try:
+                for chunk in backend.generate(prompt, question=user_input, context=chain_passage(options_chain)):
+                    ai_reply += chunk
+                    placeholder.markdown(ai_reply)
+            except BackendUnavailable as e:
+                ai_reply = f"Sorry, the {backend.name} backend is unavailable: {e}"
+                placeholder.markdown(ai_reply)
+            memory.add("AI", ai_reply)
+
+@st.fragment
+def render_chat_history():
+    """Render the newest messages, loading older ones only on request."""
+    transcript = st.session_state.chat_memory.transcript
+    if not transcript:
+        return
     st.subheader("Chat History")
-    for role, text in st.session_state.chat_history:
+    shown = st.session_state.setdefault("chat_history_shown", HISTORY_PAGE)
+    hidden = len(transcript) - shown
+    if hidden > 0 and st.button(f"Show older messages ({hidden} hidden)"):
+        st.session_state.chat_history_shown += HISTORY_PAGE
+        st.rerun(scope="fragment")
+    for role, text in transcript[-shown:]:
         st.markdown(f"**{role}:** {text}")
+
+render_chat_history()
+
+startup_profile.mark("script end")
+if startup_profile.ENABLED:
+    with st.sidebar.expander("⏱️ Startup profile"):
+        for label, seconds in startup_profile.marks():
+            st.write(f"{label}: {seconds * 1e3:.0f} ms")
+        st.caption("Run `python app/startup_profile.py` for the import-time breakdown.")
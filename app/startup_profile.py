@@ -0,0 +1,140 @@
+"""Cold-start profiling for the Streamlit app.
+
+Two views of startup cost:
+
+* `start()` / `mark(label)` record wall time within a script run.
+  main_streamlit.py marks its import and first-render milestones; set
+  APP_PROFILE=1 to show them in the sidebar.
+* `python app/startup_profile.py` runs the app's startup imports in a fresh
+  interpreter under `-X importtime`, times a cold bare-mode run of
+  main_streamlit.py, and prints (or saves as JSON) the slowest imports. Use
+  `--budget-ms` to fail when cold start exceeds a budget, so new analytics
+  modules don't creep onto the startup path unnoticed. A run where the app
+  fails to start always exits non-zero.
+
+This module only imports the standard library, so importing it costs nothing.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ENABLED = os.environ.get("APP_PROFILE", "") not in ("", "0")
+
+# Modules main_streamlit.py imports before its first render
+STARTUP_MODULES = ["streamlit", "etrade.client", "llm", "analytics", "startup_profile"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_origin = time.perf_counter()
+_marks = []
+
+
+def start():
+    """Reset the clock; call at the top of each script run (Streamlit reruns included)."""
+    global _origin
+    _origin = time.perf_counter()
+    _marks.clear()
+
+
+def mark(label):
+    """Record a milestone as seconds since the last start()."""
+    _marks.append((label, time.perf_counter() - _origin))
+
+
+def marks():
+    """Return recorded (label, seconds) milestones in order."""
+    return list(_marks)
+
+
+def import_profile(modules=None, top=20):
+    """Profile imports of `modules` in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (total seconds, list of {"module", "self_ms", "cumulative_ms", "depth"}
+        for the `top` slowest modules by cumulative time)
+    """
+    modules = modules or STARTUP_MODULES
+    code = "; ".join(f"import {m}" for m in modules)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True
+    )
+    total = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self_ms": int(m.group(1)) / 1000,
+                "cumulative_ms": int(m.group(2)) / 1000,
+                "depth": len(m.group(3)) // 2,
+            })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return total, rows[:top]
+
+
+def cold_start(script="main_streamlit.py", runs=3):
+    """Median wall time of `python <script>` in bare mode (no server), in seconds.
+
+    Streamlit runs scripts without a server when invoked with plain python;
+    widgets return defaults, so this measures import + first-render script cost.
+    Raises RuntimeError if the script fails, since its timing would be meaningless.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, script], cwd=APP_DIR,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            raise RuntimeError(f"{script} exited with status {proc.returncode}: {last}")
+    return sorted(times)[len(times) // 2]
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Cold-start profile for the Streamlit app")
+    parser.add_argument("--top", type=int, default=20, help="number of slowest imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="bare-mode cold starts to time")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--budget-ms", type=float, help="exit non-zero if cold start exceeds this")
+    args = parser.parse_args(argv)
+
+    try:
+        import_total, rows = import_profile(top=args.top)
+        cold = cold_start(runs=args.runs)
+    except RuntimeError as e:
+        print(f"Cold start failed: {e}")
+        return 1
+
+    print(f"Startup imports ({', '.join(STARTUP_MODULES)}): {import_total * 1e3:.0f} ms")
+    print(f"Cold start of main_streamlit.py (bare mode, median of {args.runs}): {cold * 1e3:.0f} ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for r in rows:
+        print(f"{r['cumulative_ms']:14.1f} {r['self_ms']:9.1f}  {'  ' * r['depth']}{r['module']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"import_ms": import_total * 1e3, "cold_start_ms": cold * 1e3, "imports": rows}, f, indent=2)
+
+    if args.budget_ms is not None and cold * 1e3 > args.budget_ms:
+        print(f"\nCold start {cold * 1e3:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# benchmarks/llm_backends.py
+"""Compare latency and throughput of the chat backends.
+
+Usage:
+    python benchmarks/llm_backends.py                       # QA backend variants + Ollama if running
+    python benchmarks/llm_backends.py --variants torch onnx --concurrency 16
+
+Latency is measured with one request at a time; throughput with `concurrency`
+requests in flight, which is where the QA backend's micro-batching pays off.
+Results go to benchmarks/results/llm-<commit>.json.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from llm.backends import QA_MODEL, OllamaBackend, TransformersQABackend  # noqa: E402
+from llm.memory import chain_passage, chain_preview  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+QUESTIONS = [
+    "What is the call bid at strike 100.0?",
+    "What is the put ask at strike 99.5?",
+    "Which strike has a call iv of 0.25?",
+    "What is the put open interest at strike 101.0?",
+]
+VARIANTS = {
+    "torch": {},
+    "torch-int8": {"quantize": True},
+    "onnx": {"onnx": True},
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _measure(name, ask, requests, concurrency):
+    ask(requests[0])  # warm-up
+    latencies = []
+    for req in requests:
+        start = time.perf_counter()
+        ask(req)
+        latencies.append(time.perf_counter() - start)
+
+    batch = requests * max(1, (concurrency * 4) // len(requests))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(ask, batch))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "backend": name,
+        "median_latency_s": statistics.median(latencies),
+        "p95_latency_s": sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)],
+        "throughput_rps": len(batch) / elapsed,
+        "concurrency": concurrency,
+    }
+    print(f"{name:<18} median {result['median_latency_s'] * 1e3:8.1f} ms"
+          f"  p95 {result['p95_latency_s'] * 1e3:8.1f} ms  {result['throughput_rps']:7.1f} req/s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=QA_MODEL)
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--rows", type=int, default=50, help="chain rows in the context")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-ollama", action="store_true")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/llm-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    chain = pd.read_csv(io.StringIO(synthetic.flat_chain_csv(args.rows))).drop(columns="expiry")
+    passage = chain_passage(chain, rows=args.rows)
+    preview = chain_preview(chain, rows=args.rows)
+    requests = QUESTIONS * 3
+
+    results = []
+    for variant in args.variants:
+        backend = TransformersQABackend(args.model, **VARIANTS[variant])
+        start = time.perf_counter()
+        backend.warm_up()
+        load_s = time.perf_counter() - start
+        result = _measure(f"qa-{variant}", lambda q: backend.ask(q, passage), requests, args.concurrency)
+        result["load_s"] = load_s
+        results.append(result)
+
+    ollama = OllamaBackend()
+    if not args.skip_ollama and ollama.available():
+        def ask_ollama(q):
+            return ollama.complete(f"{preview}\n\nAnswer briefly: {q}")
+        results.append(_measure(f"ollama-{ollama.model}", ask_ollama, requests, args.concurrency))
+    elif not args.skip_ollama:
+        print("Ollama not reachable; skipping")
+
+    commit = _git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"llm-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "model": args.model,
+            "context_rows": args.rows,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# benchmarks/run_benchmarks.py
+"""Time and memory-profile the fetch -> parse -> analyze -> prompt pipeline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # all sizes, writes results/<commit>.json
+    python benchmarks/run_benchmarks.py --sizes 100 1000     # subset of sizes
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+
+Each case is timed over several repeats (min and median reported) and its peak
+Python allocation is measured with tracemalloc in a separate run, so the
+profiling overhead doesn't skew the timings.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic  # noqa: E402
+from etrade.connector import get_options_chain  # noqa: E402
+from components.market_data import chain_to_frames, flag_bad_quotes  # noqa: E402
+from analytics.chain_quality import scan_chain  # noqa: E402
+from llm import ConversationMemory, chain_preview  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+REGRESSION_THRESHOLD = 1.20  # flag cases >20% slower than the baseline
+
+
+class _RecordedResponse:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+        self.text = ""
+
+    def json(self):
+        # Re-decode every call, as a real response would
+        return json.loads(self._payload)
+
+
+class _RecordedSession:
+    """Replays a recorded optionchains JSON body for every GET."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def get(self, url, params=None):
+        return _RecordedResponse(self.payload)
+
+
+def _cases(rows):
+    """Build the benchmark cases for one chain size: name -> zero-arg callable."""
+    recorded = json.dumps(synthetic.etrade_chain_json(rows))
+    session = _RecordedSession(recorded)
+    chain = synthetic.client_chain(rows)
+    csv_text = synthetic.flat_chain_csv(rows)
+    uploaded = pd.read_csv(io.StringIO(csv_text))
+
+    memory = ConversationMemory()
+    for i in range(20):
+        memory.add("You" if i % 2 == 0 else "AI", f"Turn {i}: what about the {100 + i} strike calls? " * 5)
+
+    def csv_ingest():
+        df = pd.read_csv(io.StringIO(csv_text))
+        original_columns = list(df.columns)
+        df, _ = scan_chain(df, today=synthetic.TODAY, drop=True)
+        return df[original_columns]
+
+    expiry = synthetic.FIRST_EXPIRY.isoformat()
+
+    def chain_frames_scan():
+        calls_df, puts_df = chain_to_frames(chain)
+        return calls_df, puts_df, flag_bad_quotes(calls_df, puts_df, expiry, today=synthetic.TODAY)
+    return {
+        "get_options_chain.flatten": lambda: get_options_chain(session, "", expiry=expiry),
+        "get_options_chain.flatten+scan": lambda: get_options_chain(
+            session, "", expiry=expiry, quality_check=True, today=synthetic.TODAY
+        ),
+        "render_option_chain.frames": lambda: chain_to_frames(chain),
+        "render_option_chain.frames+scan": chain_frames_scan,
+        "csv_ingest.read+scan": csv_ingest,
+        "chat.prompt": lambda: memory.build_prompt("Which strikes look cheap?", context=chain_preview(uploaded)),
+    }
+
+
+def _time(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes, repeat):
+    results = []
+    for rows in sizes:
+        # fewer repeats for the big chains keeps a full run under a few minutes
+        n = max(3, repeat if rows <= 10_000 else repeat // 3)
+        for name, fn in _cases(rows).items():
+            samples = _time(fn, n)
+            result = {
+                "name": name,
+                "rows": rows,
+                "repeat": n,
+                "min_s": min(samples),
+                "median_s": statistics.median(samples),
+                "peak_kib": _peak_memory(fn) / 1024,
+            }
+            results.append(result)
+            print(f"{name:<34}{rows:>8} rows  median {result['median_s'] * 1e3:9.2f} ms"
+                  f"  peak {result['peak_kib']:10.0f} KiB")
+    return results
+
+
+def compare(current, baseline_path):
+    """Print per-case ratios against a previous results file; return regression count."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    old = {(r["name"], r["rows"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\nComparison against {baseline.get('commit', '?')} ({baseline_path})")
+    for r in current:
+        prev = old.get((r["name"], r["rows"]))
+        if prev is None:
+            continue
+        ratio = r["median_s"] / prev["median_s"] if prev["median_s"] else float("inf")
+        mem_ratio = r["peak_kib"] / prev["peak_kib"] if prev["peak_kib"] else float("inf")
+        marker = ""
+        if ratio > REGRESSION_THRESHOLD:
+            marker = "  <-- REGRESSION"
+            regressions += 1
+        print(f"{r['name']:<34}{r['rows']:>8} rows  time x{ratio:5.2f}  mem x{mem_ratio:5.2f}{marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    results = run(args.sizes, args.repeat)
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
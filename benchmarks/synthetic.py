@@ -0,0 +1,119 @@
+# benchmarks/synthetic.py
+"""Synthetic option chain generators for the benchmark suite.
+
+Chains are priced with Black-Scholes around a fixed spot so quotes look
+realistic (monotonic in strike, parity-consistent) and can be produced in the
+three shapes the app deals with: the raw E*TRADE optionchains JSON, the
+{"CALL": [...], "PUT": [...]} dict returned by etrade.client.get_option_chains,
+and the flat CSV/DataFrame layout of etrade.get_options_chain.
+"""
+import math
+from datetime import date, timedelta
+
+SPOT = 100.0
+RATE = 0.04
+STRIKE_STEP = 0.5
+STRIKE_SPAN = 0.5     # strikes stay within SPOT * (1 +/- STRIKE_SPAN)
+EXPIRY_SPACING = 30   # days between expiries
+TODAY = date(2025, 1, 2)
+FIRST_EXPIRY = TODAY + timedelta(days=EXPIRY_SPACING)
+
+
+def _ncdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _bs(spot, strike, t, iv):
+    sqrt_t = math.sqrt(t)
+    d1 = (math.log(spot / strike) + (RATE + 0.5 * iv * iv) * t) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    call = spot * _ncdf(d1) - strike * math.exp(-RATE * t) * _ncdf(d2)
+    put = call - spot + strike * math.exp(-RATE * t)
+    return call, put, _ncdf(d1)
+
+
+def _quote(value):
+    value = max(value, 0.01)
+    spread = max(0.01, round(value * 0.02, 2))
+    return round(value - spread / 2, 2), round(value + spread / 2, 2)
+
+
+def chain_rows(n_rows, n_expiries=None, today=None):
+    """Yield (expiry, strike, call, put) tuples for n_rows strike/expiry pairs.
+
+    call/put are dicts with bid, ask, last, iv, delta, open_interest. Every
+    expiry uses the same strike grid centred on SPOT; the step shrinks for
+    large chains so strikes stay positive and unique per expiry.
+    """
+    today = today or TODAY
+    n_expiries = n_expiries or max(1, min(12, n_rows // 100))
+    per_expiry = math.ceil(n_rows / n_expiries)
+    step = min(STRIKE_STEP, math.floor(2 * STRIKE_SPAN * SPOT / per_expiry * 1e4) / 1e4)
+    if step <= 0:
+        raise ValueError(f"{per_expiry} strikes per expiry don't fit the strike grid; use more expiries")
+    lo = round(SPOT - step * (per_expiry // 2), 4)
+    produced = 0
+    for e in range(n_expiries):
+        expiry = today + timedelta(days=EXPIRY_SPACING * (e + 1))
+        t = (expiry - today).days / 365.0
+        for i in range(per_expiry):
+            if produced == n_rows:
+                return
+            strike = round(lo + i * step, 4)
+            iv = 0.25 + 0.1 * abs(math.log(strike / SPOT)) + 0.01 * i / per_expiry
+            call_v, put_v, call_delta = _bs(SPOT, strike, t, iv)
+            call_bid, call_ask = _quote(call_v)
+            put_bid, put_ask = _quote(put_v)
+            oi = 100 + (i * 37) % 5000
+            yield expiry, strike, {
+                "bid": call_bid, "ask": call_ask, "last": round(call_v, 2),
+                "iv": round(iv, 6), "delta": round(call_delta, 4), "open_interest": oi,
+            }, {
+                "bid": put_bid, "ask": put_ask, "last": round(put_v, 2),
+                "iv": round(iv, 6), "delta": round(call_delta - 1.0, 4), "open_interest": oi,
+            }
+            produced += 1
+
+
+def etrade_chain_json(n_rows, symbol="XYZ"):
+    """Raw optionchains response as parsed by etrade.get_options_chain.
+
+    Like the real endpoint it holds a single expiry, FIRST_EXPIRY.
+    """
+    pairs = []
+    for expiry, strike, call, put in chain_rows(n_rows, n_expiries=1):
+        pairs.append({
+            "StrikePrice": strike,
+            "Call": {"Bid": call["bid"], "Ask": call["ask"], "ImpliedVolatility": call["iv"],
+                     "OpenInterest": call["open_interest"]},
+            "Put": {"Bid": put["bid"], "Ask": put["ask"], "ImpliedVolatility": put["iv"],
+                    "OpenInterest": put["open_interest"]},
+        })
+    return {"OptionChainResponse": {"OptionPair": pairs, "symbol": symbol}}
+
+
+def client_chain(n_rows, symbol="XYZ"):
+    """{"CALL": [...], "PUT": [...]} as returned by etrade.client.get_option_chains (one expiry)."""
+    chain = {"CALL": [], "PUT": []}
+    for expiry, strike, call, put in chain_rows(n_rows, n_expiries=1):
+        for side, q in (("CALL", call), ("PUT", put)):
+            chain[side].append({
+                "symbol": f"{symbol} {expiry:%b %d '%y} ${strike:.2f} {side.title()}",
+                "optionType": side, "optionCategory": "STANDARD", "optionRootSymbol": symbol,
+                "strikePrice": strike, "bid": q["bid"], "ask": q["ask"], "lastPrice": q["last"],
+                "volume": q["open_interest"] // 3, "openInterest": q["open_interest"],
+                "iv": q["iv"], "delta": q["delta"],
+            })
+    return chain
+
+
+def flat_chain_csv(n_rows):
+    """CSV text in the flat get_options_chain layout (plus an expiry column)."""
+    lines = ["expiry,strike,call_bid,call_ask,call_iv,call_open_interest,"
+             "put_bid,put_ask,put_iv,put_open_interest"]
+    for expiry, strike, call, put in chain_rows(n_rows):
+        lines.append(
+            f"{expiry.isoformat()},{strike},{call['bid']},{call['ask']},{call['iv']},"
+            f"{call['open_interest']},{put['bid']},{put['ask']},{put['iv']},{put['open_interest']}"
+        )
+    return "\n".join(lines) + "\n"
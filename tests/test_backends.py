@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from llm import backends
+from llm.backends import BackendUnavailable, TransformersQABackend, route_question
+
+
+class _SlowRuntime:
+    def answer_batch(self, pairs):
+        time.sleep(0.5)
+        return [{"answer": "100", "score": 1.0} for _ in pairs]
+
+
+class _Down(backends.LLMBackend):
+    def available(self):
+        return False
+
+
+@pytest.fixture
+def slow_backend(monkeypatch):
+    backend = TransformersQABackend("slow-model")
+    monkeypatch.setitem(backends._runtimes, ("slow-model", False, False), _SlowRuntime())
+    return backend
+
+
+def test_loaded_model_is_available(slow_backend):
+    assert slow_backend.available()
+    assert slow_backend.ask("What is the strike?", "Strike 100.")["answer"] == "100"
+
+
+def test_timeout_raises_backend_unavailable(slow_backend):
+    with pytest.raises(BackendUnavailable):
+        slow_backend.ask("What is the strike?", "Strike 100.", timeout=0.05)
+    # the worker survives the abandoned request
+    assert slow_backend.ask("What is the strike?", "Strike 100.")["answer"] == "100"
+
+
+def test_failed_load_is_unavailable(monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("model download failed")
+
+    monkeypatch.setattr(backends, "_QARuntime", fail)
+    backend = TransformersQABackend("missing-model")
+    assert not backend.available()
+    backend._loader.join()
+    assert isinstance(backend.load_error, BackendUnavailable)
+    assert not backend.available()
+    assert route_question("What is the strike?", "Strike 100.", _Down(), backend) is None
+    with pytest.raises(BackendUnavailable):
+        backend.ask("What is the strike?", "Strike 100.")
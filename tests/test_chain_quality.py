@@ -0,0 +1,143 @@
+import math
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from analytics.chain_quality import CHECKS, scan_chain
+from etrade.connector import get_options_chain
+
+TODAY = date(2025, 1, 2)
+SPOT = 100.0
+RATE = 0.04
+
+
+def _ncdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def _chain(days=(30,), strikes=range(90, 111), iv=0.25):
+    """Clean Black-Scholes chain with tight quotes around each fair value."""
+    rows = []
+    for d in days:
+        t = d / 365.0
+        for i, k in enumerate(strikes):
+            vol = iv + 0.002 * i
+            d1 = (math.log(SPOT / k) + (RATE + 0.5 * vol * vol) * t) / (vol * math.sqrt(t))
+            call = SPOT * _ncdf(d1) - k * math.exp(-RATE * t) * _ncdf(d1 - vol * math.sqrt(t))
+            put = call - SPOT + k * math.exp(-RATE * t)
+            rows.append({
+                "expiry": (TODAY + timedelta(days=d)).isoformat(),
+                "strike": float(k),
+                "call_bid": round(call - 0.02, 2), "call_ask": round(call + 0.02, 2), "call_iv": vol,
+                "put_bid": round(put - 0.02, 2), "put_ask": round(put + 0.02, 2), "put_iv": vol,
+            })
+    return pd.DataFrame(rows)
+
+
+def _flagged(df, check):
+    return df.loc[df[check], "strike"].tolist()
+
+
+def test_clean_chain_has_no_flags():
+    df, report = scan_chain(_chain(days=(30, 60)), today=TODAY)
+    assert not df["flagged"].any()
+    assert (report["quality_score"] == 1.0).all()
+    assert report.attrs["skipped_checks"] == []
+
+
+def test_missing_iv_columns_skip_iv_checks():
+    chain = _chain().drop(columns=["call_iv", "put_iv"])
+    df, report = scan_chain(chain, today=TODAY, drop=True)
+    assert len(df) == len(chain)
+    assert {"stale_iv_call", "stale_iv_put"} <= set(report.attrs["skipped_checks"])
+
+
+def test_missing_values_are_not_bad_quotes():
+    chain = _chain()
+    chain.loc[3, ["call_bid", "call_iv"]] = None
+    df, _ = scan_chain(chain, today=TODAY)
+    assert not df["flagged"].any()
+
+
+@pytest.mark.parametrize("drop_expiry, today", [
+    (True, TODAY),                          # no expiry column
+    (False, TODAY + timedelta(days=60)),    # chain already expired
+])
+def test_parity_skipped_without_usable_time_to_expiry(drop_expiry, today):
+    chain = _chain()
+    if drop_expiry:
+        chain = chain.drop(columns="expiry")
+    df, report = scan_chain(chain, today=today, drop=True)
+    assert len(df) == len(chain)
+    assert "parity_violation" in report.attrs["skipped_checks"]
+
+
+def test_crossed_and_zero_bid_quotes():
+    chain = _chain()
+    chain.loc[2, "call_bid"] = chain.loc[2, "call_ask"] + 0.5
+    chain.loc[5, "put_bid"] = 0.0
+    df, report = scan_chain(chain, today=TODAY)
+    assert _flagged(df, "crossed_call") == [92.0]
+    assert _flagged(df, "zero_bid_put") == [95.0]
+    assert report["flagged_rows"].sum() >= 2
+
+
+def test_flat_iv_is_stale():
+    chain = _chain()
+    chain.loc[10:12, "call_iv"] = 0.3
+    df, _ = scan_chain(chain, today=TODAY)
+    assert _flagged(df, "stale_iv_call") == [100.0, 101.0, 102.0]
+
+
+def test_strike_monotonicity_flags_both_legs():
+    chain = _chain()
+    chain.loc[11, ["call_bid", "call_ask"]] = chain.loc[10, "call_ask"] + 1.0, chain.loc[10, "call_ask"] + 1.1
+    df, _ = scan_chain(chain, today=TODAY)
+    assert _flagged(df, "monotonic_call") == [100.0, 101.0]
+
+
+def test_calendar_violation_across_expiries():
+    chain = _chain(days=(30, 60))
+    far = chain.index[(chain["expiry"] == chain["expiry"].max()) & (chain["strike"] == 100.0)]
+    chain.loc[far, ["call_bid", "call_ask"]] = 0.5, 0.6
+    df, _ = scan_chain(chain, today=TODAY)
+    assert _flagged(df, "calendar_call") == [100.0, 100.0]
+
+
+def test_parity_violation_with_spot():
+    chain = _chain()
+    chain.loc[10, ["put_bid", "put_ask"]] = chain.loc[10, "put_bid"] + 2.0, chain.loc[10, "put_ask"] + 2.0
+    df, _ = scan_chain(chain, spot=SPOT, today=TODAY)
+    assert _flagged(df, "parity_violation") == [100.0]
+
+
+def test_empty_chain():
+    df, report = scan_chain(pd.DataFrame(columns=["strike", "call_bid", "call_ask"]), today=TODAY)
+    assert df.empty and report.empty
+    assert set(CHECKS) <= set(df.columns)
+
+
+class _Response:
+    status_code = 200
+    text = ""
+
+    def json(self):
+        return {"OptionChainResponse": {"OptionPair": [
+            {"StrikePrice": 100.0, "Call": {"Bid": 1.0, "Ask": 1.1}, "Put": {"Bid": 0.9, "Ask": 1.0}},
+        ]}}
+
+
+class _Session:
+    def get(self, url, params=None):
+        return _Response()
+
+
+def test_connector_returns_plain_chain_by_default():
+    df = get_options_chain(_Session(), "")
+    assert list(df.columns) == [
+        "strike", "call_bid", "call_ask", "call_iv", "call_open_interest",
+        "put_bid", "put_ask", "put_iv", "put_open_interest",
+    ]
+    flagged = get_options_chain(_Session(), "", quality_check=True)
+    assert "flagged" in flagged.columns and "quality" in flagged.attrs
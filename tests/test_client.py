@@ -0,0 +1,107 @@
+import pytest
+
+import etrade.client as client
+from etrade.market_index import SymbolIndex
+
+
+class _Response:
+    def __init__(self, payload=None, status_code=200):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class _Session:
+    """Returns scripted responses keyed by URL suffix and records every call."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, dict(params or {})))
+        for suffix, responses in self.routes.items():
+            if url.endswith(suffix):
+                return responses.pop(0) if isinstance(responses, list) else responses
+        raise AssertionError(f"unexpected GET {url}")
+
+
+@pytest.fixture
+def symbol_index(tmp_path, monkeypatch):
+    index = SymbolIndex(str(tmp_path / "symbols.json"))
+    monkeypatch.setattr(client, "get_symbol_index", lambda: index)
+    return index
+
+
+def test_lookup_product_multi_word_query(symbol_index):
+    session = _Session({"/v1/market/lookup/MICROSOFT CORP.json": _Response({"LookupResponse": {"Data": [
+        {"symbol": "msft", "description": "MICROSOFT CORP", "type": "EQUITY"},
+        {"symbol": "MSFT1", "description": "MICROSOFT CORP ADJ", "type": "OPTN"},
+    ]}})})
+    first = client.lookup_product(session, "", "microsoft corp")
+    assert [r["symbol"] for r in first] == ["MSFT", "MSFT1"]
+    # an exact repeat is served from the index with the same results
+    assert client.lookup_product(session, "", "Microsoft Corp ") == first
+    assert len(session.calls) == 1
+
+
+def test_lookup_product_no_content(symbol_index):
+    session = _Session({"/v1/market/lookup/ZZZZ.json": _Response(status_code=204)})
+    assert client.lookup_product(session, "", "zzzz") == []
+
+
+def test_get_quotes_batches_25_symbols():
+    symbols = [f"S{i}" for i in range(30)]
+
+    def quotes(batch):
+        return _Response({"QuoteResponse": {"QuoteData": [
+            {"Product": {"symbol": s}, "All": {"lastTrade": float(i)}} for i, s in enumerate(batch)
+        ]}})
+
+    session = _Session({".json": [quotes(symbols[:25]), quotes(symbols[25:])]})
+    result = client.get_quotes(session, "", [" s0 ", ""] + symbols[1:])
+    assert len(session.calls) == 2
+    assert session.calls[1][0] == f"/v1/market/quote/{','.join(symbols[25:])}.json"
+    assert result["S0"] == 0.0 and result["S29"] == 4.0 and len(result) == 30
+
+
+def test_list_accounts_and_balance():
+    session = _Session({
+        "/v1/accounts/list.json": _Response({"AccountListResponse": {"Accounts": {"Account": [
+            {"accountIdKey": "k1", "accountDesc": "Brokerage"},
+        ]}}}),
+        "/v1/accounts/k1/balance.json": _Response({"BalanceResponse": {"Computed": {"cashBuyingPower": 1500.0}}}),
+    })
+    accounts = client.list_accounts(session, "")
+    assert [a["accountIdKey"] for a in accounts] == ["k1"]
+    assert client.get_account_balance(session, "", "k1") == {"cashBuyingPower": 1500.0}
+    assert session.calls[1][1] == {"instType": "BROKERAGE", "realTimeNAV": "true"}
+
+
+def test_account_calls_raise_on_error():
+    session = _Session({".json": _Response(status_code=500)})
+    with pytest.raises(Exception, match="500"):
+        client.list_accounts(session, "")
+    with pytest.raises(Exception, match="500"):
+        client.get_portfolio_positions(session, "", "k1")
+
+
+def test_portfolio_positions_walks_all_pages():
+    def page(symbols, total_pages=3):
+        return _Response({"PortfolioResponse": {"AccountPortfolio": [
+            {"totalPages": total_pages, "Position": [{"symbolDescription": s} for s in symbols]},
+        ]}})
+
+    session = _Session({"/portfolio.json": [page(["AAPL", "MSFT"]), page(["SPY"]), page(["QQQ"])]})
+    positions = client.get_portfolio_positions(session, "", "k1", page_size=2)
+    assert [p["symbolDescription"] for p in positions] == ["AAPL", "MSFT", "SPY", "QQQ"]
+    assert [params["pageNumber"] for _, params in session.calls] == [1, 2, 3]
+    assert session.calls[0][1] == {"view": "COMPLETE", "count": 2, "pageNumber": 1}
+
+
+def test_portfolio_positions_empty_account():
+    session = _Session({"/portfolio.json": _Response(status_code=204)})
+    assert client.get_portfolio_positions(session, "", "k1") == []
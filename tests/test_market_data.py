@@ -0,0 +1,110 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import synthetic  # noqa: E402
+from components.market_data import (  # noqa: E402
+    _estimate_atm_strike, _paginate, _strike_window, chain_to_frames, flag_bad_quotes,
+)
+
+EXPIRY = synthetic.FIRST_EXPIRY.strftime("%Y%m%d")
+
+
+@pytest.fixture
+def frames():
+    return chain_to_frames(synthetic.client_chain(40))
+
+
+def _flagged(df):
+    return df.index[df["flagged"]].tolist()
+
+
+def test_clean_chain_has_no_flags(frames):
+    calls_df, puts_df = frames
+    report = flag_bad_quotes(calls_df, puts_df, EXPIRY, today=synthetic.TODAY)
+    assert _flagged(calls_df) == [] and _flagged(puts_df) == []
+    assert report["quality_score"].iloc[0] == 1.0
+    assert report.attrs["skipped_checks"] == []
+
+
+def test_bad_quotes_flag_their_side(frames):
+    calls_df, puts_df = frames
+    calls_df.loc[35, "bid"] = 0.0
+    puts_df.loc[2, "bid"] = 0.0
+    flag_bad_quotes(calls_df, puts_df, EXPIRY, today=synthetic.TODAY)
+    assert _flagged(calls_df) == [35]
+    assert _flagged(puts_df) == [2]
+
+
+def test_parity_violation_flags_both_sides(frames):
+    calls_df, puts_df = frames
+    calls_df.loc[20, ["bid", "ask"]] += 3.0
+    flag_bad_quotes(calls_df, puts_df, EXPIRY, today=synthetic.TODAY)
+    assert 20 in _flagged(calls_df) and 20 in _flagged(puts_df)
+
+
+def test_one_sided_chain_skips_parity(frames):
+    calls_df, _ = frames
+    puts_df = calls_df.iloc[0:0, 0:0]
+    report = flag_bad_quotes(calls_df, puts_df, EXPIRY, today=synthetic.TODAY)
+    assert "parity_violation" in report.attrs["skipped_checks"]
+    assert _flagged(calls_df) == []
+
+
+def _side(strikes, mids=None):
+    mids = mids or [1.0] * len(strikes)
+    return pd.DataFrame({"strikePrice": strikes, "bid": [m - 0.05 for m in mids], "ask": [m + 0.05 for m in mids]})
+
+
+STRIKES = [90.0, 95.0, 100.0, 105.0, 110.0]
+
+
+def test_atm_strike_from_parity():
+    calls = _side(STRIKES, [11.0, 7.0, 3.5, 1.2, 0.4])
+    puts = _side(STRIKES, [0.5, 1.4, 3.4, 6.5, 10.8])
+    assert _estimate_atm_strike(calls, puts) == 100.0
+
+
+@pytest.mark.parametrize("calls, puts", [
+    (_side(STRIKES), pd.DataFrame()),
+    (pd.DataFrame(), _side(STRIKES)),
+    (_side(STRIKES).drop(columns=["bid", "ask"]), _side(STRIKES)),
+])
+def test_atm_strike_falls_back_to_median(calls, puts):
+    assert _estimate_atm_strike(calls, puts) == 100.0
+
+
+def test_atm_strike_without_strikes():
+    assert _estimate_atm_strike(pd.DataFrame(), pd.DataFrame()) is None
+
+
+@pytest.mark.parametrize("atm, width, expected", [
+    (100.0, 1, [95.0, 100.0, 105.0]),
+    (90.0, 2, [90.0, 95.0, 100.0]),      # clipped at the lowest strike
+    (111.0, 1, [105.0, 110.0]),          # nearest strike is the highest
+    (100.0, 10, STRIKES),
+])
+def test_strike_window_bounds(atm, width, expected):
+    assert _strike_window(_side(STRIKES), atm, width)["strikePrice"].tolist() == expected
+
+
+def test_strike_window_keeps_duplicate_strikes_and_skips_without_atm():
+    df = _side([95.0, 100.0, 100.0, 105.0, 110.0])
+    assert _strike_window(df, 100.0, 0)["strikePrice"].tolist() == [100.0, 100.0]
+    assert _strike_window(df, None, 1) is df
+
+
+def test_one_sided_chain_is_windowed():
+    puts = _side([float(k) for k in range(50, 151, 5)])
+    atm = _estimate_atm_strike(pd.DataFrame(), puts)
+    assert _strike_window(puts, atm, 2)["strikePrice"].tolist() == [90.0, 95.0, 100.0, 105.0, 110.0]
+
+
+@pytest.mark.parametrize("page, expected", [(1, [0, 1, 2]), (3, [6, 7, 8]), (4, [9]), (5, [])])
+def test_paginate(page, expected):
+    df = pd.DataFrame({"n": range(10)})
+    assert _paginate(df, page, 3)["n"].tolist() == expected
@@ -0,0 +1,38 @@
+from datetime import date
+
+from etrade.market_index import ExpiryIndex, SymbolIndex
+
+TODAY = date(2025, 1, 2)
+
+
+def test_prefix_lookup_does_not_cover_longer_queries(tmp_path):
+    index = SymbolIndex(str(tmp_path / "symbols.json"))
+    index.add("A", [{"symbol": "A", "description": "Agilent Technologies", "type": "EQUITY"}], today=TODAY)
+    assert index.covers("a", today=TODAY)
+    assert not index.covers("AMZN", today=TODAY)
+    assert not index.covers("A", today=date(2025, 1, 3))
+
+
+def test_search_by_ticker_and_description_word(tmp_path):
+    path = str(tmp_path / "symbols.json")
+    SymbolIndex(path).add("AM", [
+        {"symbol": "AMZN", "description": "Amazon.com Inc", "type": "EQUITY"},
+        {"symbol": "AMD", "description": "Advanced Micro Devices", "type": "EQUITY"},
+    ], today=TODAY)
+    index = SymbolIndex(path)  # reloaded from disk
+    assert [r["symbol"] for r in index.search("am")] == ["AMD", "AMZN"]
+    assert [r["symbol"] for r in index.search("micro")] == ["AMD"]
+
+
+def test_expiry_index_is_fresh_for_the_day(tmp_path):
+    index = ExpiryIndex(str(tmp_path / "expiries.json"))
+    index.put("AAPL", ["2025-01-17"], today=TODAY)
+    assert index.get("aapl", today=TODAY) == ["2025-01-17"]
+    assert index.get("AAPL", today=date(2025, 1, 3)) is None
+
+
+def test_multi_word_search(tmp_path):
+    index = SymbolIndex(str(tmp_path / "symbols.json"))
+    index.add("APPLE", [{"symbol": "AAPL", "description": "APPLE INC", "type": "EQUITY"}], today=TODAY)
+    assert [r["symbol"] for r in index.search("apple inc")] == ["AAPL"]
+    assert index.search("apple corp") == []
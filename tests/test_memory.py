@@ -0,0 +1,89 @@
+import pytest
+
+from llm.memory import ANALYZE_TRAILER, ConversationMemory, estimate_tokens
+
+CONTEXT = "strike call_bid call_ask\n" * 200
+
+
+def _drain(memory):
+    # the summarizer runs on a single-worker executor, so this waits for it
+    memory._executor.submit(lambda: None).result(timeout=5)
+
+
+def _memory(max_prompt_tokens, turns=20, summarize_fn=lambda prompt: "Discussed AAPL 190 calls. " * 20):
+    memory = ConversationMemory(summarize_fn=summarize_fn, max_prompt_tokens=max_prompt_tokens, recent_turns=6)
+    for i in range(turns):
+        memory.add("You" if i % 2 == 0 else "AI", f"Turn {i}: what about the {100 + i} strike? " * 3)
+    _drain(memory)
+    return memory
+
+
+@pytest.mark.parametrize("budget", [20, 50, 200, 1000])
+@pytest.mark.parametrize("question", ["Which strikes look cheap?", "Explain the skew in detail. " * 40])
+@pytest.mark.parametrize("context", [None, CONTEXT])
+def test_prompt_stays_within_budget(budget, question, context):
+    prompt = _memory(budget).build_prompt(question, context=context)
+    assert estimate_tokens(prompt) <= budget
+
+
+def test_question_comes_last_before_trailer():
+    memory = _memory(400, summarize_fn=lambda prompt: "Discussed AAPL calls.")
+    with_context = memory.build_prompt("Which strikes look cheap?", context="strike 100 call bid 1.2")
+    parts = with_context.split("\n\n")
+    assert parts[-2:] == ["User question: Which strikes look cheap?", ANALYZE_TRAILER]
+    assert parts[0] == "Summary of the earlier conversation:\nDiscussed AAPL calls."
+    assert parts[1].startswith("Recent conversation:\n")
+    assert parts[2] == "Here is the relevant options data:\nstrike 100 call bid 1.2"
+
+    without_context = memory.build_prompt("Which strikes look cheap?")
+    assert without_context.split("\n\n")[-1] == "User question: Which strikes look cheap?"
+
+
+def test_long_question_is_truncated():
+    prompt = _memory(50, turns=0).build_prompt("word " * 400)
+    assert prompt.startswith("User question: word")
+    assert prompt.endswith("…")
+    assert estimate_tokens(prompt) <= 50
+
+
+def test_add_evicts_old_turns_into_summary():
+    prompts = []
+
+    def summarize(prompt):
+        prompts.append(prompt)
+        return "summary of turns"
+
+    memory = _memory(10_000, turns=8, summarize_fn=summarize)
+    assert len(memory.transcript) == 8
+    assert memory.summary == "summary of turns"
+    assert memory._pending == []
+    # the two evicted turns were sent to the summarizer
+    assert "Turn 0:" in prompts[0] and "Turn 1:" in "".join(prompts)
+    prompt = memory.build_prompt("q?")
+    assert "Turn 1:" not in prompt and prompt.count("Turn 7:") == 3
+    assert "summary of turns" in prompt
+
+
+def test_summarizer_failure_keeps_raw_turns():
+    def fail(prompt):
+        raise RuntimeError("ollama down")
+
+    memory = _memory(10_000, turns=8, summarize_fn=fail)
+    assert "Turn 0:" in memory.summary and "Turn 1:" in memory.summary
+    assert memory._pending == []
+
+
+def test_summary_is_bounded():
+    memory = ConversationMemory(summarize_fn=None, recent_turns=1, summary_tokens=20)
+    for i in range(10):
+        memory.add("You", f"Turn {i}: " + "x" * 100)
+    _drain(memory)
+    assert estimate_tokens(memory.summary) <= 20
+    assert memory.summary.startswith("…") and "x" in memory.summary
+
+
+def test_clear():
+    memory = _memory(1000, turns=8)
+    memory.clear()
+    assert memory.transcript == [] and memory.summary == ""
+    assert memory.build_prompt("q?") == "User question: q?"
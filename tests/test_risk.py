@@ -0,0 +1,117 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics.risk import CONTRACT_MULTIPLIER, POSITION_COLUMNS, PortfolioRisk, positions_to_frame
+
+TODAY = date(2025, 1, 2)
+EXPIRY = TODAY + timedelta(days=45)
+SPOTS = {"AAPL": 190.0, "MSFT": 410.0}
+
+
+def _book(rows):
+    return pd.DataFrame(rows, columns=POSITION_COLUMNS)
+
+
+BOOK = _book([
+    ("AAPL", "CALL", 195.0, EXPIRY, 0.28, 3),
+    ("AAPL", "PUT", 180.0, EXPIRY, 0.32, -2),
+    ("AAPL", None, np.nan, None, np.nan, 100),
+    ("MSFT", "CALL", 420.0, EXPIRY, 0.25, -1),
+])
+
+
+def _pnl(risk, spot_shocks=(0.0,), vol_shocks=(0.0,)):
+    return risk.scenario_grid(spot_shocks, vol_shocks).to_numpy()
+
+
+def test_greeks_match_finite_differences():
+    aapl = PortfolioRisk(BOOK[BOOK["symbol"] == "AAPL"], SPOTS, today=TODAY)
+    greeks = aapl.net_greeks().loc["AAPL"]
+    spot, eps = SPOTS["AAPL"], 1e-4
+
+    down, flat, up = _pnl(aapl, spot_shocks=(-eps, 0.0, eps))[:, 0]
+    assert greeks["delta"] == pytest.approx((up - down) / (2 * eps * spot), rel=1e-4)
+    assert greeks["gamma"] == pytest.approx((up - 2 * flat + down) / (eps * spot) ** 2, rel=1e-2)
+
+    vol_down, vol_up = _pnl(aapl, vol_shocks=(-0.001, 0.001))[0]
+    assert greeks["vega"] == pytest.approx((vol_up - vol_down) / 0.2, rel=1e-4)
+
+    tomorrow = PortfolioRisk(aapl.positions, SPOTS, today=TODAY + timedelta(days=1))
+    decay = ((tomorrow._legs["value"] - aapl._legs["value"]) * aapl._legs["units"]).sum()
+    assert greeks["theta"] == pytest.approx(decay, rel=2e-2)
+    assert greeks["dollar_delta"] == pytest.approx(greeks["delta"] * spot)
+
+
+def test_what_if_matches_full_recompute():
+    book = PortfolioRisk(BOOK, SPOTS, buying_power=50_000, today=TODAY)
+    candidates = pd.DataFrame([
+        ("AAPL", "PUT", 185.0, EXPIRY, 0.30, 1, "collar"),
+        ("AAPL", "CALL", 205.0, EXPIRY, 0.26, -1, "collar"),
+        ("NVDA", "CALL", 130.0, EXPIRY, 0.50, 2, "nvda"),
+    ], columns=POSITION_COLUMNS + ["candidate_id"])
+    spots = {**SPOTS, "NVDA": 125.0}
+    result = book.what_if(candidates, spots={"NVDA": 125.0})
+    assert list(result.index) == ["collar", "nvda"]
+
+    for cid, legs in candidates.groupby("candidate_id"):
+        combined = PortfolioRisk(pd.concat([BOOK, legs[POSITION_COLUMNS]]), spots, today=TODAY)
+        total = combined.net_greeks(by_underlying=False).iloc[0]
+        for name in ("delta", "gamma", "vega", "theta", "dollar_delta"):
+            assert result.loc[cid, f"{name}_after"] == pytest.approx(total[name])
+        assert result.loc[cid, "worst_pnl_after"] == pytest.approx(combined.scenario_grid().to_numpy().min())
+    assert (result["worst_pnl_before"] == book.scenario_grid().to_numpy().min()).all()
+    assert (result["bp_after"] == 50_000 - result["bp_required"]).all()
+
+
+def test_buying_power_requirement():
+    book = PortfolioRisk(_book([]), {}, today=TODAY)
+    candidates = _book([
+        ("AAPL", "CALL", 195.0, EXPIRY, 0.28, 2),      # long option: premium paid
+        ("AAPL", "PUT", 170.0, EXPIRY, 0.30, -1),      # short OTM put: 20% of spot less OTM amount
+        ("AAPL", None, np.nan, None, np.nan, -50),     # stock: full value either side
+    ])
+    result = book.what_if(candidates, spots=SPOTS)
+    long_call = PortfolioRisk(candidates.iloc[:1], SPOTS, today=TODAY)._legs["value"][0]
+    assert result.loc[0, "bp_required"] == pytest.approx(long_call * 2 * CONTRACT_MULTIPLIER)
+    assert result.loc[1, "bp_required"] == pytest.approx((0.20 * 190.0 - 20.0) * CONTRACT_MULTIPLIER)
+    assert result.loc[2, "bp_required"] == pytest.approx(190.0 * 50)
+
+
+def test_empty_book():
+    book = PortfolioRisk(_book([]), {}, today=TODAY)
+    assert book.net_greeks().empty
+    assert (book.scenario_grid().to_numpy() == 0).all()
+    assert book.what_if(_book([])).empty
+    result = book.what_if(_book([("AAPL", None, np.nan, None, np.nan, 10)]), spots=SPOTS)
+    assert result.loc[0, "delta_after"] == 10
+
+
+def test_missing_spot_raises():
+    with pytest.raises(ValueError, match="MSFT"):
+        PortfolioRisk(BOOK, {"AAPL": 190.0}, today=TODAY)
+    book = PortfolioRisk(BOOK, SPOTS, today=TODAY)
+    with pytest.raises(ValueError, match="NVDA"):
+        book.what_if(_book([("NVDA", None, np.nan, None, np.nan, 1)]))
+
+
+def test_positions_to_frame():
+    records = [
+        {"positionType": "SHORT", "quantity": 2,
+         "Product": {"symbol": "aapl", "securityType": "OPTN", "callPut": "PUT", "strikePrice": 180,
+                     "expiryYear": 2025, "expiryMonth": 2, "expiryDay": 21},
+         "Complete": {"ivPct": 31.5}},
+        {"positionType": "SHORT", "quantity": -100, "Product": {"symbol": "MSFT", "securityType": "EQ"}},
+        {"positionType": "LONG", "quantity": 50, "Product": {"symbol": "SPY", "securityType": "EQ"}},
+        {"positionType": "LONG", "quantity": 1, "Product": {"symbol": "VFIAX", "securityType": "MF"}},
+    ]
+    frame = positions_to_frame(records)
+    assert list(frame.columns) == POSITION_COLUMNS
+    assert frame["symbol"].tolist() == ["AAPL", "MSFT", "SPY"]
+    assert frame["quantity"].tolist() == [-2, -100, 50]
+    option = frame.iloc[0]
+    assert (option["option_type"], option["strike"], option["expiry"]) == ("PUT", 180.0, date(2025, 2, 21))
+    assert option["iv"] == pytest.approx(0.315)
+    assert np.isnan(frame.iloc[1]["iv"])
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from etrade.token_manager import ManagedSession, TokenExpiredError, TokenRenewalError
+
+
+class _Response:
+    def __init__(self, status_code=200, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class _Session:
+    """OAuth session stand-in: API calls and renewals return scripted responses."""
+
+    access_token = "token"
+    access_token_secret = "secret"
+
+    def __init__(self, responses, renewals=()):
+        self.responses = list(responses)
+        self.renewals = list(renewals)
+
+    def request(self, method, url, **kwargs):
+        return self.responses.pop(0)
+
+    def get(self, url, **kwargs):
+        result = self.renewals.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _managed(responses, renewals=()):
+    managed = ManagedSession(_Session(responses, renewals), issued_at=time.time())
+    managed.stop()
+    return managed
+
+
+def test_inactive_token_is_renewed_and_retried():
+    managed = _managed([_Response(401, "oauth_problem=token_rejected"), _Response(200)], [_Response(200)])
+    assert managed.get("url").status_code == 200
+    assert not managed.is_expired()
+
+
+def test_network_error_during_renewal_does_not_expire_session():
+    managed = _managed([_Response(401, "oauth_problem=token_rejected")], [ConnectionError("blip")])
+    with pytest.raises(TokenRenewalError):
+        managed.get("url")
+    assert not managed.is_expired()
+
+
+def test_generic_401_does_not_expire_session():
+    managed = _managed([_Response(401), _Response(401)], [_Response(200)])
+    with pytest.raises(TokenRenewalError):
+        managed.get("url")
+    assert not managed.is_expired()
+
+
+@pytest.mark.parametrize("problem", ["token_expired", "token_revoked"])
+def test_expired_or_revoked_token_expires_session(problem):
+    managed = _managed([_Response(401, f"oauth_problem={problem}")], [_Response(401, f"oauth_problem={problem}")])
+    with pytest.raises(TokenExpiredError):
+        managed.get("url")
+    assert managed.is_expired()
+
+
+def test_session_expires_at_midnight_eastern():
+    managed = _managed([])
+    managed.expires_at = time.time() - 1
+    with pytest.raises(TokenExpiredError):
+        managed.get("url")